@@ -4,11 +4,19 @@ from django.utils.translation import gettext_lazy as _
 from .models import CustomUser, UserProfile, UserSession
 
 
+def _is_changelist(request):
+    match = request.resolver_match
+    return bool(match and match.url_name and match.url_name.endswith('_changelist'))
+
+
 class UserProfileInline(admin.StackedInline):
     model = UserProfile
     can_delete = False
     verbose_name_plural = 'Profile'
     fk_name = 'user'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
 
 
 @admin.register(CustomUser)
@@ -111,6 +119,15 @@ class CustomUserAdmin(BaseUserAdmin):
     
     readonly_fields = ('date_joined', 'last_login')
     
+    # Columns loaded for the changelist; password and the rest are skipped
+    changelist_fields = list_display
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if _is_changelist(request):
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
+    
     def get_inline_instances(self, request, obj=None):
         if not obj:
             return list()
@@ -131,6 +148,8 @@ class UserProfileAdmin(admin.ModelAdmin):
         'created_at'
     )
     
+    list_select_related = ('user',)
+    
     list_filter = (
         'timezone',
         'language',
@@ -173,6 +192,8 @@ class UserSessionAdmin(admin.ModelAdmin):
         'last_activity'
     )
     
+    list_select_related = ('user',)
+    
     list_filter = (
         'is_active',
         'created_at',
@@ -180,8 +201,37 @@ class UserSessionAdmin(admin.ModelAdmin):
     )
     
     search_fields = ('user__email', 'session_key', 'ip_address')
+    search_help_text = 'Search by user email, IP address or the start of a session key.'
     readonly_fields = ('session_key', 'created_at', 'last_activity')
     
+    # Search terms at least this long are treated as session key prefixes
+    session_key_search_min_length = 16
+    
+    # Columns loaded for the changelist; the user_agent text is skipped.
+    # session_key stays: __str__ needs it for the action checkbox label.
+    changelist_fields = (
+        'user',
+        'session_key',
+        'ip_address',
+        'is_active',
+        'created_at',
+        'last_activity'
+    )
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if _is_changelist(request):
+            queryset = queryset.only(*self.changelist_fields)
+        return queryset
+    
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if len(term) >= self.session_key_search_min_length and term.isalnum():
+            # Prefix lookup can use the session_key index instead of a
+            # full scan with LIKE '%term%' on every search field
+            return queryset.filter(session_key__startswith=term), False
+        return super().get_search_results(request, queryset, search_term)
+    
     def session_key_short(self, obj):
         return f"{obj.session_key[:8]}..."
     session_key_short.short_description = 'Session Key'
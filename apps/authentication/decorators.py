@@ -1,76 +1,127 @@
-from functools import wraps
+import hashlib
+import hmac
+from functools import lru_cache, wraps
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
 from django.shortcuts import redirect
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+from .utils import get_client_ip, parse_json_body
 
 
-def etl_permission_required(permission):
+def _has_etl_permission(request, permission):
     """
-    Decorator to check if user has specific ETL permission.
+    Check an ETL permission for the request user, memoized on the request
+    so stacked decorators and mixins don't repeat the lookup.
+    """
+    cache = request.__dict__.setdefault('_etl_perm_cache', {})
+    if permission not in cache:
+        cache[permission] = request.user.has_etl_permission(permission)
+    return cache[permission]
+
+
+def _wants_json(request):
+    """
+    Return True if the request expects a JSON response (AJAX or JSON API call).
+    """
+    wants_json = getattr(request, '_wants_json', None)
+    if wants_json is None:
+        wants_json = (
+            request.headers.get('x-requested-with') == 'XMLHttpRequest'
+            or request.content_type == 'application/json'
+            or 'application/json' in request.headers.get('accept', '')
+        )
+        request._wants_json = wants_json
+    return wants_json
+
+
+def _deny(request, error, message):
+    """
+    Build the response for a failed access check: a JSON 403 for API/AJAX
+    callers, otherwise a flash message and a redirect to the dashboard.
+    """
+    if _wants_json(request):
+        return JsonResponse({'error': error}, status=403)
+    messages.error(request, message)
+    return redirect('ui:dashboard')
+
+
+def _guard(check, describe):
+    """
+    Build a login-required view decorator from a predicate.
     
-    Usage:
-        @etl_permission_required('create_pipelines')
-        def my_view(request):
-            ...
+    ``check(request)`` returns whether access is granted; ``describe()``
+    returns the ``(json_error, message)`` pair used when it is not.
     """
     def decorator(view_func):
         @wraps(view_func)
         @login_required
         def _wrapped_view(request, *args, **kwargs):
-            if not request.user.has_etl_permission(permission):
-                if request.is_ajax() or request.content_type == 'application/json':
-                    return JsonResponse({
-                        'error': f'Permission denied. Required permission: {permission}'
-                    }, status=403)
-                else:
-                    messages.error(
-                        request, 
-                        f'You do not have permission to {permission.replace("_", " ")}.'
-                    )
-                    return redirect('ui:dashboard')
+            if not check(request):
+                return _deny(request, *describe())
             return view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
 
 
+def _has_all_etl_permissions(request, permissions):
+    for permission in permissions:
+        if not _has_etl_permission(request, permission):
+            return False
+    return True
+
+
+def _has_any_etl_permission(request, permissions):
+    # Permissions are checked in the order given; list the most
+    # commonly granted one first
+    for permission in permissions:
+        if _has_etl_permission(request, permission):
+            return True
+    return False
+
+
+def _humanize(permissions):
+    return ', '.join(p.replace('_', ' ') for p in permissions)
+
+
+def etl_permission_required(permission):
+    """
+    Decorator to check if user has specific ETL permission.
+    
+    Usage:
+        @etl_permission_required('create_pipelines')
+        def my_view(request):
+            ...
+    """
+    return _guard(
+        lambda request: _has_etl_permission(request, permission),
+        lambda: (
+            f'Permission denied. Required permission: {permission}',
+            f'You do not have permission to {permission.replace("_", " ")}.'
+        )
+    )
+
+
 def staff_required(view_func):
     """
     Decorator to require staff status.
     """
-    @wraps(view_func)
-    @login_required
-    def _wrapped_view(request, *args, **kwargs):
-        if not request.user.is_staff:
-            if request.is_ajax() or request.content_type == 'application/json':
-                return JsonResponse({
-                    'error': 'Staff access required'
-                }, status=403)
-            else:
-                messages.error(request, 'Staff access required.')
-                return redirect('ui:dashboard')
-        return view_func(request, *args, **kwargs)
-    return _wrapped_view
+    return _guard(
+        lambda request: request.user.is_staff,
+        lambda: ('Staff access required', 'Staff access required.')
+    )(view_func)
 
 
 def superuser_required(view_func):
     """
     Decorator to require superuser status.
     """
-    @wraps(view_func)
-    @login_required
-    def _wrapped_view(request, *args, **kwargs):
-        if not request.user.is_superuser:
-            if request.is_ajax() or request.content_type == 'application/json':
-                return JsonResponse({
-                    'error': 'Superuser access required'
-                }, status=403)
-            else:
-                messages.error(request, 'Superuser access required.')
-                return redirect('ui:dashboard')
-        return view_func(request, *args, **kwargs)
-    return _wrapped_view
+    return _guard(
+        lambda request: request.user.is_superuser,
+        lambda: ('Superuser access required', 'Superuser access required.')
+    )(view_func)
 
 
 def multiple_etl_permissions_required(*permissions):
@@ -82,26 +133,13 @@ def multiple_etl_permissions_required(*permissions):
         def my_view(request):
             ...
     """
-    def decorator(view_func):
-        @wraps(view_func)
-        @login_required
-        def _wrapped_view(request, *args, **kwargs):
-            for permission in permissions:
-                if not request.user.has_etl_permission(permission):
-                    missing_perms = [p.replace('_', ' ') for p in permissions]
-                    if request.is_ajax() or request.content_type == 'application/json':
-                        return JsonResponse({
-                            'error': f'Permission denied. Required permissions: {", ".join(missing_perms)}'
-                        }, status=403)
-                    else:
-                        messages.error(
-                            request, 
-                            f'You do not have the required permissions: {", ".join(missing_perms)}.'
-                        )
-                        return redirect('ui:dashboard')
-            return view_func(request, *args, **kwargs)
-        return _wrapped_view
-    return decorator
+    return _guard(
+        lambda request: _has_all_etl_permissions(request, permissions),
+        lambda: (
+            f'Permission denied. Required permissions: {_humanize(permissions)}',
+            f'You do not have the required permissions: {_humanize(permissions)}.'
+        )
+    )
 
 
 def any_etl_permission_required(*permissions):
@@ -113,35 +151,40 @@ def any_etl_permission_required(*permissions):
         def my_view(request):
             ...
     """
-    def decorator(view_func):
-        @wraps(view_func)
-        @login_required
-        def _wrapped_view(request, *args, **kwargs):
-            has_permission = any(
-                request.user.has_etl_permission(permission) 
-                for permission in permissions
-            )
-            
-            if not has_permission:
-                required_perms = [p.replace('_', ' ') for p in permissions]
-                if request.is_ajax() or request.content_type == 'application/json':
-                    return JsonResponse({
-                        'error': f'Permission denied. At least one required: {", ".join(required_perms)}'
-                    }, status=403)
-                else:
-                    messages.error(
-                        request, 
-                        f'You need at least one of these permissions: {", ".join(required_perms)}.'
-                    )
-                    return redirect('ui:dashboard')
-            return view_func(request, *args, **kwargs)
-        return _wrapped_view
-    return decorator
+    return _guard(
+        lambda request: _has_any_etl_permission(request, permissions),
+        lambda: (
+            f'Permission denied. At least one required: {_humanize(permissions)}',
+            f'You need at least one of these permissions: {_humanize(permissions)}.'
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def _api_key_digests():
+    """
+    SHA-256 digests of the configured API keys, indexed by their first
+    8 bytes so a lookup is O(1) whatever the number of keys.
+    """
+    digests = {}
+    for key in getattr(settings, 'API_KEYS', ()):
+        digest = hashlib.sha256(key.encode()).digest()
+        digests[digest[:8]] = digest
+    return digests
+
+
+def _is_valid_api_key(api_key):
+    digest = hashlib.sha256(api_key.encode()).digest()
+    expected = _api_key_digests().get(digest[:8])
+    # Final comparison is constant-time
+    return expected is not None and hmac.compare_digest(digest, expected)
 
 
 def api_key_required(view_func):
     """
     Decorator for API views that require API key authentication.
+    
+    Keys are read from ``settings.API_KEYS``.
     """
     @wraps(view_func)
     def _wrapped_view(request, *args, **kwargs):
@@ -152,9 +195,7 @@ def api_key_required(view_func):
                 'error': 'API key required'
             }, status=401)
         
-        # Here you would validate the API key against your API key model
-        # For now, this is a placeholder
-        if api_key != 'your-secret-api-key':
+        if not _is_valid_api_key(api_key):
             return JsonResponse({
                 'error': 'Invalid API key'
             }, status=401)
@@ -163,6 +204,79 @@ def api_key_required(view_func):
     return _wrapped_view
 
 
+def _login_email(request):
+    """
+    Email submitted to a login endpoint: the ``username`` form field, or
+    ``email`` in a JSON body.
+    """
+    if request.content_type == 'application/json':
+        try:
+            email = parse_json_body(request).get('email')
+        except (ValueError, AttributeError):
+            return None
+    else:
+        email = request.POST.get('username')
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+# Rate limit key name -> function returning the identifier to count against
+_RATE_LIMIT_KEYS = {
+    'ip': get_client_ip,
+    'email': _login_email,
+    'user': lambda request: request.user.pk,
+}
+
+
+def _rate_limit_exceeded(cache_key, limit, period):
+    """
+    Count a hit in a fixed ``period``-second window and return True once
+    the count goes over ``limit``.
+    """
+    # add() only sets the key (and its expiry) at the start of a window
+    cache.add(cache_key, 0, period)
+    try:
+        return cache.incr(cache_key) > limit
+    except ValueError:
+        # Window expired between add() and incr()
+        cache.set(cache_key, 1, period)
+        return False
+
+
+def rate_limit(limit, period=60, key='ip'):
+    """
+    Decorator limiting POST requests to ``limit`` per ``period`` seconds for
+    each client, as identified by ``key`` ('ip', 'email' or 'user').
+    
+    Counters live in the default cache, so throttled requests are rejected
+    before any password hashing or database lookup.
+    
+    Usage:
+        @rate_limit(10, key='ip')
+        @rate_limit(5, key='email')
+        def login_view(request):
+            ...
+    """
+    get_identifier = _RATE_LIMIT_KEYS[key]
+    
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method == 'POST':
+                identifier = get_identifier(request)
+                if identifier is not None:
+                    digest = hashlib.blake2b(
+                        str(identifier).encode(), digest_size=16
+                    ).hexdigest()
+                    cache_key = f'ratelimit:{view_func.__name__}:{key}:{digest}'
+                    if _rate_limit_exceeded(cache_key, limit, period):
+                        if _wants_json(request):
+                            return JsonResponse({'error': 'Too many requests'}, status=429)
+                        return HttpResponse('Too many requests. Please try again later.', status=429)
+            return view_func(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+
 class ETLPermissionMixin:
     """
     Mixin for class-based views to check ETL permissions.
@@ -177,7 +291,7 @@ class ETLPermissionMixin:
         
         # Check single permission
         if self.required_etl_permission:
-            if not request.user.has_etl_permission(self.required_etl_permission):
+            if not _has_etl_permission(request, self.required_etl_permission):
                 messages.error(
                     request, 
                     f'You do not have permission to {self.required_etl_permission.replace("_", " ")}.'
@@ -186,26 +300,19 @@ class ETLPermissionMixin:
         
         # Check multiple permissions (AND logic)
         if self.required_etl_permissions:
-            for permission in self.required_etl_permissions:
-                if not request.user.has_etl_permission(permission):
-                    missing_perms = [p.replace('_', ' ') for p in self.required_etl_permissions]
-                    messages.error(
-                        request, 
-                        f'You do not have the required permissions: {", ".join(missing_perms)}.'
-                    )
-                    return redirect('ui:dashboard')
+            if not _has_all_etl_permissions(request, self.required_etl_permissions):
+                messages.error(
+                    request, 
+                    f'You do not have the required permissions: {_humanize(self.required_etl_permissions)}.'
+                )
+                return redirect('ui:dashboard')
         
         # Check multiple permissions (OR logic)
         if self.any_etl_permissions:
-            has_permission = any(
-                request.user.has_etl_permission(permission) 
-                for permission in self.any_etl_permissions
-            )
-            if not has_permission:
-                required_perms = [p.replace('_', ' ') for p in self.any_etl_permissions]
+            if not _has_any_etl_permission(request, self.any_etl_permissions):
                 messages.error(
                     request, 
-                    f'You need at least one of these permissions: {", ".join(required_perms)}.'
+                    f'You need at least one of these permissions: {_humanize(self.any_etl_permissions)}.'
                 )
                 return redirect('ui:dashboard')
         
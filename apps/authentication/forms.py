@@ -1,9 +1,17 @@
+import hashlib
+
 from django import forms
+from django.conf import settings
+from django.core.cache import cache
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm, AuthenticationForm
-from django.contrib.auth import authenticate
+from django.contrib.auth import authenticate, password_validation
 from django.utils.translation import gettext_lazy as _
 from .models import CustomUser, UserProfile
 
+# Shared widget attributes; spread into per-field attrs, never mutated
+FORM_CONTROL = {'class': 'form-control'}
+FORM_CHECK = {'class': 'form-check-input'}
+
 
 class CustomUserCreationForm(UserCreationForm):
     """
@@ -12,7 +20,7 @@ class CustomUserCreationForm(UserCreationForm):
     email = forms.EmailField(
         required=True,
         widget=forms.EmailInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Enter your email address'
         })
     )
@@ -21,7 +29,7 @@ class CustomUserCreationForm(UserCreationForm):
         max_length=150,
         required=True,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'First name'
         })
     )
@@ -30,7 +38,7 @@ class CustomUserCreationForm(UserCreationForm):
         max_length=150,
         required=True,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Last name'
         })
     )
@@ -39,7 +47,7 @@ class CustomUserCreationForm(UserCreationForm):
         max_length=100,
         required=False,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Department (optional)'
         })
     )
@@ -48,10 +56,32 @@ class CustomUserCreationForm(UserCreationForm):
         max_length=100,
         required=False,
         widget=forms.TextInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Job title (optional)'
         })
     )
+    
+    password1 = forms.CharField(
+        label=_('Password'),
+        strip=False,
+        widget=forms.PasswordInput(attrs={
+            **FORM_CONTROL,
+            'placeholder': 'Password',
+            'autocomplete': 'new-password'
+        }),
+        help_text=password_validation.password_validators_help_text_html()
+    )
+    
+    password2 = forms.CharField(
+        label=_('Password confirmation'),
+        strip=False,
+        widget=forms.PasswordInput(attrs={
+            **FORM_CONTROL,
+            'placeholder': 'Confirm password',
+            'autocomplete': 'new-password'
+        }),
+        help_text=_('Enter the same password as before, for verification.')
+    )
 
     class Meta:
         model = CustomUser
@@ -65,17 +95,6 @@ class CustomUserCreationForm(UserCreationForm):
             'password2'
         )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['password1'].widget.attrs.update({
-            'class': 'form-control',
-            'placeholder': 'Password'
-        })
-        self.fields['password2'].widget.attrs.update({
-            'class': 'form-control',
-            'placeholder': 'Confirm password'
-        })
-
     def save(self, commit=True):
         user = super().save(commit=False)
         user.email = self.cleaned_data['email']
@@ -109,8 +128,9 @@ class CustomAuthenticationForm(AuthenticationForm):
     """
     username = forms.EmailField(
         label=_('Email'),
+        help_text='',
         widget=forms.EmailInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Enter your email address',
             'autofocus': True
         })
@@ -120,34 +140,50 @@ class CustomAuthenticationForm(AuthenticationForm):
         label=_('Password'),
         strip=False,
         widget=forms.PasswordInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Enter your password',
             'autocomplete': 'current-password'
         })
     )
 
-    def __init__(self, request=None, *args, **kwargs):
-        super().__init__(request, *args, **kwargs)
-        # Remove the username field help text
-        self.fields['username'].help_text = None
+    # Seconds a failed (email, password) pair is rejected without re-hashing
+    failed_login_timeout = 60
 
     def clean(self):
         username = self.cleaned_data.get('username')
         password = self.cleaned_data.get('password')
 
         if username is not None and password:
+            failure_key = self._failed_login_key(username, password)
+            if cache.get(failure_key):
+                raise self.get_invalid_login_error()
+
             self.user_cache = authenticate(
                 self.request,
                 username=username,
                 password=password
             )
             if self.user_cache is None:
+                cache.set(failure_key, True, self.failed_login_timeout)
                 raise self.get_invalid_login_error()
             else:
                 self.confirm_login_allowed(self.user_cache)
 
         return self.cleaned_data
 
+    @staticmethod
+    def _failed_login_key(username, password):
+        """
+        Cache key for a failed login attempt. Keyed with SECRET_KEY so the
+        cache never holds a plain digest of the password.
+        """
+        digest = hashlib.blake2b(
+            f'{username.lower()}\0{password}'.encode(),
+            key=settings.SECRET_KEY.encode()[:64],
+            digest_size=16
+        )
+        return f'auth_fail:{digest.hexdigest()}'
+
 
 class UserProfileForm(forms.ModelForm):
     """
@@ -166,14 +202,14 @@ class UserProfileForm(forms.ModelForm):
         ]
         widgets = {
             'bio': forms.Textarea(attrs={
-                'class': 'form-control',
+                **FORM_CONTROL,
                 'rows': 4,
                 'placeholder': 'Tell us about yourself...'
             }),
-            'timezone': forms.Select(attrs={'class': 'form-control'}),
-            'language': forms.Select(attrs={'class': 'form-control'}),
-            'email_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-            'pipeline_notifications': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'timezone': forms.Select(attrs=FORM_CONTROL),
+            'language': forms.Select(attrs=FORM_CONTROL),
+            'email_notifications': forms.CheckboxInput(attrs=FORM_CHECK),
+            'pipeline_notifications': forms.CheckboxInput(attrs=FORM_CHECK),
         }
 
 
@@ -184,7 +220,7 @@ class PasswordChangeForm(forms.Form):
     old_password = forms.CharField(
         label=_('Current password'),
         widget=forms.PasswordInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Enter your current password'
         })
     )
@@ -192,7 +228,7 @@ class PasswordChangeForm(forms.Form):
     new_password1 = forms.CharField(
         label=_('New password'),
         widget=forms.PasswordInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Enter new password'
         })
     )
@@ -200,7 +236,7 @@ class PasswordChangeForm(forms.Form):
     new_password2 = forms.CharField(
         label=_('Confirm new password'),
         widget=forms.PasswordInput(attrs={
-            'class': 'form-control',
+            **FORM_CONTROL,
             'placeholder': 'Confirm new password'
         })
     )
@@ -230,5 +266,5 @@ class PasswordChangeForm(forms.Form):
         password = self.cleaned_data['new_password1']
         self.user.set_password(password)
         if commit:
-            self.user.save()
+            self.user.save(update_fields=['password'])
         return self.user
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from apps.authentication.models import UserSession
+from apps.authentication.utils import delete_expired_sessions
 
 
 class Command(BaseCommand):
@@ -14,6 +15,12 @@ class Command(BaseCommand):
             default=30,
             help='Clean sessions older than N days (default: 30)'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Maximum number of sessions deleted per query (default: 5000)'
+        )
         parser.add_argument(
             '--dry-run',
             action='store_true',
@@ -30,20 +37,23 @@ class Command(BaseCommand):
             last_activity__lt=cutoff_date
         )
         
-        count = expired_sessions.count()
-        
         if dry_run:
+            count = expired_sessions.count()
             self.stdout.write(
                 self.style.WARNING(
                     f'DRY RUN: Would delete {count} sessions older than {days} days'
                 )
             )
-            for session in expired_sessions[:10]:  # Show first 10
-                self.stdout.write(f'  - {session.user.email}: {session.last_activity}')
+            preview = expired_sessions.values_list('user__email', 'last_activity')[:10]
+            for email, last_activity in preview:  # Show first 10
+                self.stdout.write(f'  - {email}: {last_activity}')
             if count > 10:
                 self.stdout.write(f'  ... and {count - 10} more')
         else:
-            deleted_count, _ = expired_sessions.delete()
+            deleted_count = delete_expired_sessions(
+                days=days,
+                batch_size=options['batch_size']
+            )
             self.stdout.write(
                 self.style.SUCCESS(
                     f'Successfully deleted {deleted_count} expired sessions'
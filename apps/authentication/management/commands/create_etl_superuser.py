@@ -49,14 +49,14 @@ class Command(BaseCommand):
                 self.style.WARNING(f'Generated password: {password}')
             )
 
-        if User.objects.filter(email=email).exists():
+        if User.objects.filter(email__iexact=email).exists():
             self.stdout.write(
                 self.style.ERROR(f'User with email {email} already exists')
             )
             return
 
         try:
-            user = User.objects.create_superuser(
+            User.objects.create_superuser(
                 email=email,
                 password=password,
                 first_name=first_name,
@@ -66,7 +66,7 @@ class Command(BaseCommand):
             self.stdout.write(
                 self.style.SUCCESS(f'Successfully created superuser: {email}')
             )
-            self.stdout.write(f'Name: {user.get_full_name()}')
+            self.stdout.write(f'Name: {first_name} {last_name}')
             self.stdout.write(f'ETL Permissions: All enabled')
             
         except Exception as e:
@@ -1,4 +1,6 @@
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import BaseUserManager
+from django.db.models import Case, CharField, Q, Value, When
 from django.utils.translation import gettext_lazy as _
 
 
@@ -43,6 +45,66 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def create_users_bulk(self, users_data, batch_size=500):
+        """
+        Create many users with batched INSERTs.
+        
+        Each item of ``users_data`` is a dict with an ``email``, an optional
+        raw ``password`` and any other model fields. Passwords are hashed
+        with ``make_password`` up front; a missing password gives an
+        unusable one.
+        
+        ``bulk_create`` does not send ``post_save``, so no ``UserProfile``
+        rows are created: callers are responsible for provisioning them.
+        """
+        users = []
+        for data in users_data:
+            fields = dict(data)
+            email = fields.pop('email', None)
+            if not email:
+                raise ValueError(_('The Email field must be set'))
+            password = fields.pop('password', None)
+            users.append(self.model(
+                email=self.normalize_email(email),
+                password=make_password(password),
+                **fields
+            ))
+        return self.bulk_create(users, batch_size=batch_size)
+
+    def for_permission_check(self):
+        """
+        Return a queryset that only loads the columns read by permission
+        checks (``check_user_permissions``, ``has_etl_permission``).
+        
+        Usage:
+            user = User.objects.for_permission_check().get(pk=user_id)
+        """
+        from .models import ETL_PERMISSION_FIELDS
+        
+        return self.only('is_active', 'is_superuser', *ETL_PERMISSION_FIELDS.values())
+
+    def with_role(self):
+        """
+        Annotate each user with ``role``, the label returned by
+        ``get_user_role_display``, computed in SQL.
+        
+        Usage:
+            for user in User.objects.with_role():
+                user.role
+        """
+        return self.annotate(role=Case(
+            When(is_superuser=True, then=Value('Super Administrator')),
+            When(is_staff=True, then=Value('Administrator')),
+            When(
+                Q(can_create_pipelines=True, can_modify_pipelines=True),
+                then=Value('Pipeline Developer')
+            ),
+            When(can_execute_pipelines=True, then=Value('Pipeline Operator')),
+            When(can_view_monitoring=True, then=Value('Viewer')),
+            default=Value('Basic User'),
+            output_field=CharField(),
+        ))
+
     def get_by_natural_key(self, email):
         """
         Get user by email (natural key).
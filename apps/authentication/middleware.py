@@ -1,8 +1,11 @@
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth import logout
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.cache import cache
 from django.shortcuts import redirect
 from django.utils import timezone
-from .models import UserSession
+from .models import CustomUser, UserSession
 
 
 class SessionTimeoutMiddleware(MiddlewareMixin):
@@ -15,19 +18,15 @@ class SessionTimeoutMiddleware(MiddlewareMixin):
             session_key = request.session.session_key
             
             if session_key:
-                try:
-                    user_session = UserSession.objects.get(
-                        user=request.user,
-                        session_key=session_key,
-                        is_active=True
-                    )
-                    
-                    # Update last activity
-                    user_session.last_activity = timezone.now()
-                    user_session.save(update_fields=['last_activity'])
-                    
-                except UserSession.DoesNotExist:
-                    # Session doesn't exist or is inactive, logout user
+                # Update last activity; no matching row means the session
+                # doesn't exist or is inactive
+                updated = UserSession.objects.filter(
+                    user=request.user,
+                    session_key=session_key,
+                    is_active=True
+                ).update(last_activity=timezone.now())
+                
+                if not updated:
                     logout(request)
                     return redirect('authentication:login')
         
@@ -37,8 +36,16 @@ class SessionTimeoutMiddleware(MiddlewareMixin):
 class IPRestrictionMiddleware(MiddlewareMixin):
     """
     Middleware to restrict access based on IP addresses (if configured).
+    
+    Removed from the middleware chain at startup when ``IP_ALLOWLIST`` is
+    not set.
     """
     
+    def __init__(self, get_response):
+        if not getattr(settings, 'IP_ALLOWLIST', None):
+            raise MiddlewareNotUsed('IP_ALLOWLIST is not configured')
+        super().__init__(get_response)
+    
     def process_request(self, request):
         # This can be extended to check against allowed IP ranges
         # For now, it's a placeholder for future security enhancements
@@ -48,12 +55,22 @@ class IPRestrictionMiddleware(MiddlewareMixin):
 class UserActivityMiddleware(MiddlewareMixin):
     """
     Middleware to track user activity for analytics and security.
+    
+    The last activity timestamp is kept in the cache and only written back
+    to the user row once per ``update_interval`` seconds.
     """
+    update_interval = 300  # seconds between database writes per user
+    cache_timeout = 3600
     
     def process_request(self, request):
         if request.user.is_authenticated:
-            # Update user's last activity
-            request.user.last_login = timezone.now()
-            request.user.save(update_fields=['last_login'])
+            key = f'last_login:{request.user.pk}'
+            last = cache.get(key)
+            now = timezone.now()
+            
+            if last is None or (now - last).total_seconds() > self.update_interval:
+                # Plain UPDATE: no signals, no full-row write
+                CustomUser.objects.filter(pk=request.user.pk).update(last_login=now)
+                cache.set(key, now, self.cache_timeout)
         
         return None
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="usersession",
+            name="authenticat_user_id_f427c8_idx",
+        ),
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                fields=["user", "is_active", "last_activity"],
+                name="authenticat_user_id_2f3020_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                fields=["ip_address"], name="authenticat_ip_addr_d6bbd8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                fields=["last_activity"], name="authenticat_last_ac_04a1e9_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_usersession_search_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="usersession",
+            name="authenticat_session_1fea71_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="usersession",
+            name="authenticat_user_id_2f3020_idx",
+        ),
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["user", "-last_activity"],
+                name="usersession_active_user_idx",
+            ),
+        ),
+    ]
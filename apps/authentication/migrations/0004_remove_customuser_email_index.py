@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:36
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0003_usersession_active_user_index"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="customuser",
+            name="auth_user_email_ece7f7_idx",
+        ),
+    ]
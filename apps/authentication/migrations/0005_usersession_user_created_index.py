@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0004_remove_customuser_email_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="usersession",
+            index=models.Index(
+                fields=["user", "-created_at"], name="usersession_user_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:39
+
+from django.db import migrations, models
+from django.db.models.functions import Length, Substr
+
+
+def truncate_user_agents(apps, schema_editor):
+    # Existing values must fit before the column type is narrowed
+    UserSession = apps.get_model("authentication", "UserSession")
+    UserSession.objects.annotate(user_agent_length=Length("user_agent")).filter(
+        user_agent_length__gt=512
+    ).update(user_agent=Substr("user_agent", 1, 512))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0005_usersession_user_created_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(truncate_user_agents, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="usersession",
+            name="user_agent",
+            field=models.CharField(max_length=512),
+        ),
+    ]
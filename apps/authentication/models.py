@@ -4,6 +4,18 @@ from django.utils import timezone
 from django.core.validators import EmailValidator
 from .managers import CustomUserManager
 
+# ETL permission name -> CustomUser boolean field
+ETL_PERMISSION_FIELDS = {
+    'create_pipelines': 'can_create_pipelines',
+    'modify_pipelines': 'can_modify_pipelines',
+    'execute_pipelines': 'can_execute_pipelines',
+    'view_monitoring': 'can_view_monitoring',
+    'manage_connectors': 'can_manage_connectors',
+}
+
+# User agents longer than this are truncated before being stored
+USER_AGENT_MAX_LENGTH = 512
+
 
 class CustomUser(AbstractBaseUser, PermissionsMixin):
     """
@@ -104,8 +116,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         db_table = 'auth_user'  # Keep the same table name for easier migration
+        # email needs no explicit index: unique=True already creates one
         indexes = [
-            models.Index(fields=['email']),
             models.Index(fields=['is_active', 'is_staff']),
             models.Index(fields=['date_joined']),
         ]
@@ -126,14 +138,8 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
         """
         Check if user has specific ETL permission.
         """
-        permission_map = {
-            'create_pipelines': self.can_create_pipelines,
-            'modify_pipelines': self.can_modify_pipelines,
-            'execute_pipelines': self.can_execute_pipelines,
-            'view_monitoring': self.can_view_monitoring,
-            'manage_connectors': self.can_manage_connectors,
-        }
-        return permission_map.get(permission, False)
+        field = ETL_PERMISSION_FIELDS.get(permission)
+        return field is not None and getattr(self, field)
 
 
 class UserProfile(models.Model):
@@ -221,7 +227,7 @@ class UserSession(models.Model):
     
     session_key = models.CharField(max_length=40, unique=True)
     ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField()
+    user_agent = models.CharField(max_length=USER_AGENT_MAX_LENGTH)
     
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity = models.DateTimeField(auto_now=True)
@@ -231,8 +237,18 @@ class UserSession(models.Model):
         verbose_name = 'User Session'
         verbose_name_plural = 'User Sessions'
         indexes = [
-            models.Index(fields=['user', 'is_active']),
-            models.Index(fields=['session_key']),
+            # Lookups by session_key use the unique constraint's index
+            models.Index(
+                fields=['user', '-last_activity'],
+                condition=models.Q(is_active=True),
+                name='usersession_active_user_idx',
+            ),
+            models.Index(
+                fields=['user', '-created_at'],
+                name='usersession_user_created_idx',
+            ),
+            models.Index(fields=['ip_address']),
+            models.Index(fields=['last_activity']),
         ]
 
     def __str__(self):
@@ -1,55 +1,55 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.core.signals import setting_changed
+from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
-from .models import CustomUser, UserProfile, UserSession
+from .decorators import _api_key_digests
+from .models import CustomUser, UserProfile, UserSession, USER_AGENT_MAX_LENGTH
+from .tasks import record_user_session
+from .utils import _trusted_proxies, get_client_ip, USER_PAYLOAD_CACHE_KEY
 
 
 @receiver(post_save, sender=CustomUser)
 def create_user_profile(sender, instance, created, **kwargs):
     """
     Create a UserProfile instance when a new CustomUser is created.
+    
+    The profile is not re-saved on later user saves: code that changes
+    ``user.profile`` must call ``profile.save(update_fields=[...])`` itself.
     """
+    if kwargs.get('raw', False):
+        # Fixture loading provides its own profile rows
+        return
     if created:
         UserProfile.objects.create(user=instance)
 
 
 @receiver(post_save, sender=CustomUser)
-def save_user_profile(sender, instance, **kwargs):
+def invalidate_user_payload(sender, instance, **kwargs):
     """
-    Save the UserProfile when the CustomUser is saved.
+    Drop the cached api_login payload when a user is saved.
     """
-    if hasattr(instance, 'profile'):
-        instance.profile.save()
+    cache.delete(USER_PAYLOAD_CACHE_KEY.format(user_id=instance.pk))
 
 
 @receiver(user_logged_in)
 def user_logged_in_handler(sender, request, user, **kwargs):
     """
     Handle user login events.
-    """
-    # Update last login time
-    user.last_login = timezone.now()
-    user.save(update_fields=['last_login'])
     
-    # Update or create user session
+    ``last_login`` is already updated by Django's own ``update_last_login``
+    receiver.
+    """
+    # The session record is written by a Celery task, off the login path
     session_key = request.session.session_key
     if session_key:
-        session, created = UserSession.objects.get_or_create(
-            user=user,
-            session_key=session_key,
-            defaults={
-                'ip_address': get_client_ip(request),
-                'user_agent': request.META.get('HTTP_USER_AGENT', ''),
-                'is_active': True
-            }
-        )
-        
-        if not created:
-            # Update existing session
-            session.last_activity = timezone.now()
-            session.is_active = True
-            session.save(update_fields=['last_activity', 'is_active'])
+        ip_address = get_client_ip(request)
+        user_agent = request.META.get('HTTP_USER_AGENT', '')[:USER_AGENT_MAX_LENGTH]
+        transaction.on_commit(lambda: record_user_session.delay(
+            user.pk, session_key, ip_address, user_agent
+        ))
 
 
 @receiver(user_logged_out)
@@ -60,36 +60,19 @@ def user_logged_out_handler(sender, request, user, **kwargs):
     if user and hasattr(request, 'session'):
         session_key = request.session.session_key
         if session_key:
-            try:
-                session = UserSession.objects.get(
-                    user=user,
-                    session_key=session_key
-                )
-                session.is_active = False
-                session.save(update_fields=['is_active'])
-            except UserSession.DoesNotExist:
-                pass
-
-
-@receiver(post_delete, sender=CustomUser)
-def cleanup_user_data(sender, instance, **kwargs):
-    """
-    Clean up user-related data when a user is deleted.
-    """
-    # Delete user sessions
-    UserSession.objects.filter(user=instance).delete()
-    
-    # Additional cleanup can be added here for other user-related data
-    # For example: delete user files, clear cache, etc.
+            UserSession.objects.filter(
+                user=user,
+                session_key=session_key,
+                is_active=True
+            ).update(is_active=False, last_activity=timezone.now())
 
 
-def get_client_ip(request):
+@receiver(setting_changed)
+def clear_settings_caches(sender, setting, **kwargs):
     """
-    Get the client IP address from the request.
+    Drop values memoized from settings when they are overridden (tests).
     """
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+    if setting == 'API_KEYS':
+        _api_key_digests.cache_clear()
+    elif setting == 'TRUSTED_PROXIES':
+        _trusted_proxies.cache_clear()
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from functools import lru_cache
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+from .models import UserSession
+from .utils import delete_expired_sessions
+
+User = get_user_model()
+
+# Minimum age of last_activity before a login rewrites the session row
+SESSION_ACTIVITY_DEBOUNCE = timedelta(hours=1)
+
+
+@lru_cache(maxsize=None)
+def _email_template(template_name):
+    """
+    Compiled email template, looked up once per worker process.
+    
+    Loaded lazily rather than at import so a missing template only fails
+    the task that needs it, not the worker start-up.
+    """
+    return get_template(template_name)
+
+
+@shared_task(ignore_result=True)
+def cleanup_expired_sessions(days=30):
+    """
+    Periodic purge of inactive user sessions (scheduled by Celery beat).
+    """
+    return delete_expired_sessions(days=days)
+
+
+@shared_task(ignore_result=True)
+def record_user_session(user_id, session_key, ip_address, user_agent):
+    """
+    Record a login in UserSession (queued by ``user_logged_in_handler``).
+    """
+    now = timezone.now()
+    
+    # Only rewrite an existing row if it is stale or was deactivated
+    updated = UserSession.objects.filter(
+        Q(last_activity__lt=now - SESSION_ACTIVITY_DEBOUNCE) | Q(is_active=False),
+        user_id=user_id,
+        session_key=session_key,
+    ).update(last_activity=now, is_active=True)
+    
+    if not updated:
+        # New session; a fresh existing row is left untouched
+        UserSession.objects.bulk_create([
+            UserSession(
+                user_id=user_id,
+                session_key=session_key,
+                ip_address=ip_address,
+                user_agent=user_agent,
+                is_active=True
+            )
+        ], ignore_conflicts=True)
+
+
+@shared_task(ignore_result=True)
+def send_password_reset_email_task(user_id, reset_url):
+    """
+    Render and send the password reset email.
+    """
+    user = User.objects.get(pk=user_id)
+    
+    subject = 'Password Reset - ETL Platform'
+    message = _email_template('authentication/emails/password_reset.html').render({
+        'user': user,
+        'reset_url': reset_url,
+        'site_name': 'ETL Platform'
+    })
+    
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        fail_silently=False,
+        html_message=message
+    )
+
+
+@shared_task(ignore_result=True)
+def send_welcome_email_task(user_id):
+    """
+    Render and send the welcome email.
+    """
+    user = User.objects.get(pk=user_id)
+    
+    subject = 'Welcome to ETL Platform'
+    message = _email_template('authentication/emails/welcome.html').render({
+        'user': user,
+        'site_name': 'ETL Platform'
+    })
+    
+    send_mail(
+        subject,
+        message,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        fail_silently=False,
+        html_message=message
+    )
@@ -1,13 +1,53 @@
-from django.test import TestCase, Client
+import hashlib
+import json
+import string
+import time
+from datetime import timedelta
+from unittest import mock
+import orjson
+from celery import current_app
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from .models import UserProfile, UserSession
+from .decorators import api_key_required, rate_limit
 from .forms import CustomUserCreationForm, CustomAuthenticationForm
+from .tasks import record_user_session
+from .utils import (
+    delete_expired_sessions,
+    get_client_ip,
+    generate_random_passwords,
+    validate_password_strength
+)
 
 User = get_user_model()
 
+# PBKDF2 dominates user creation time; tests don't need a strong hash
+FAST_PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
+# Per-process caches, so tests that count cache entries don't need Redis
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+
+def advance_clock(seconds):
+    """
+    Patch ``time.time`` to run ``seconds`` ahead, expiring cache entries.
+    """
+    return mock.patch('time.time', return_value=time.time() + seconds)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class CustomUserModelTest(TestCase):
     """
     Test cases for the CustomUser model.
@@ -84,13 +124,15 @@ class CustomUserModelTest(TestCase):
             User.objects.create_user(**self.user_data)
 
 
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class UserProfileModelTest(TestCase):
     """
     Test cases for the UserProfile model.
     """
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             email='test@example.com',
             password='testpass123',
             first_name='Test',
@@ -119,6 +161,7 @@ class UserProfileModelTest(TestCase):
         self.assertEqual(str(profile), 'test@example.com Profile')
 
 
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class AuthenticationFormsTest(TestCase):
     """
     Test cases for authentication forms.
@@ -167,14 +210,15 @@ class AuthenticationFormsTest(TestCase):
         self.assertTrue(form.is_valid())
 
 
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class AuthenticationViewsTest(TestCase):
     """
     Test cases for authentication views.
     """
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             email='test@example.com',
             password='testpass123',
             first_name='Test',
@@ -183,25 +227,30 @@ class AuthenticationViewsTest(TestCase):
     
     def test_login_view_get(self):
         """Test GET request to login view."""
-        response = self.client.get(reverse('authentication:login'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('authentication:login'))
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'form')
     
     def test_login_view_post_valid(self):
         """Test POST request to login view with valid credentials."""
-        response = self.client.post(reverse('authentication:login'), {
-            'username': 'test@example.com',
-            'password': 'testpass123',
-        })
+        # User lookup, last_login update (sessions live in the cache)
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('authentication:login'), {
+                'username': 'test@example.com',
+                'password': 'testpass123',
+            })
         # Should redirect after successful login
         self.assertEqual(response.status_code, 302)
     
     def test_login_view_post_invalid(self):
         """Test POST request to login view with invalid credentials."""
-        response = self.client.post(reverse('authentication:login'), {
-            'username': 'test@example.com',
-            'password': 'wrongpassword',
-        })
+        # User lookup only
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('authentication:login'), {
+                'username': 'test@example.com',
+                'password': 'wrongpassword',
+            })
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Invalid email or password')
     
@@ -220,13 +269,15 @@ class AuthenticationViewsTest(TestCase):
     
     def test_register_view_post_valid(self):
         """Test POST request to register view with valid data."""
-        response = self.client.post(reverse('authentication:register'), {
-            'email': 'newuser@example.com',
-            'first_name': 'New',
-            'last_name': 'User',
-            'password1': 'newpass123!',
-            'password2': 'newpass123!',
-        })
+        # Email uniqueness check, user insert, profile insert (signal)
+        with self.assertNumQueries(3):
+            response = self.client.post(reverse('authentication:register'), {
+                'email': 'newuser@example.com',
+                'first_name': 'New',
+                'last_name': 'User',
+                'password1': 'newpass123!',
+                'password2': 'newpass123!',
+            })
         self.assertEqual(response.status_code, 302)  # Redirect after successful registration
         
         # Check if user was created
@@ -240,17 +291,21 @@ class AuthenticationViewsTest(TestCase):
     def test_profile_view_authenticated(self):
         """Test profile view for authenticated user."""
         self.client.login(username='test@example.com', password='testpass123')
-        response = self.client.get(reverse('authentication:profile'))
+        # Session user lookup, profile lookup
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('authentication:profile'))
         self.assertEqual(response.status_code, 200)
 
 
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
 class UserSessionModelTest(TestCase):
     """
     Test cases for the UserSession model.
     """
     
-    def setUp(self):
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
             email='test@example.com',
             password='testpass123',
             first_name='Test',
@@ -281,3 +336,417 @@ class UserSessionModelTest(TestCase):
         )
         expected = f"{self.user.email} - test_ses..."
         self.assertEqual(str(session), expected)
+
+
+def _ok_view(request):
+    return HttpResponse('ok')
+
+
+@override_settings(API_KEYS=['k1', 'secret-two'])
+class ApiKeyRequiredTest(SimpleTestCase):
+    """
+    Test cases for the api_key_required decorator.
+    """
+    
+    def setUp(self):
+        self.view = api_key_required(_ok_view)
+        self.factory = RequestFactory()
+    
+    def _get(self, api_key=None):
+        headers = {'X-Api-Key': api_key} if api_key is not None else {}
+        return self.view(self.factory.get('/', headers=headers))
+    
+    def test_valid_key(self):
+        """Test that a configured key is accepted."""
+        self.assertEqual(self._get('secret-two').status_code, 200)
+    
+    def test_invalid_key(self):
+        """Test that an unknown key is rejected."""
+        response = self._get('wrong')
+        self.assertEqual(response.status_code, 401)
+        self.assertJSONEqual(response.content, {'error': 'Invalid API key'})
+    
+    def test_missing_key(self):
+        """Test that a request without a key is rejected."""
+        response = self._get()
+        self.assertEqual(response.status_code, 401)
+        self.assertJSONEqual(response.content, {'error': 'API key required'})
+    
+    def test_same_prefix_different_digest(self):
+        """Test that a key matching only the 8-byte index prefix is rejected."""
+        digest = hashlib.sha256(b'forged').digest()
+        index = {digest[:8]: digest[:8] + bytes(24)}
+        with mock.patch(
+            'apps.authentication.decorators._api_key_digests',
+            return_value=index
+        ):
+            self.assertEqual(self._get('forged').status_code, 401)
+    
+    def test_no_keys_configured(self):
+        """Test that every key is rejected when API_KEYS is empty."""
+        with self.settings(API_KEYS=[]):
+            self.assertEqual(self._get('k1').status_code, 401)
+        # The digest index follows the settings back
+        self.assertEqual(self._get('k1').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS, CACHES=LOCMEM_CACHES)
+class FailedLoginCacheTest(TestCase):
+    """
+    Test cases for the failed-login cache of CustomAuthenticationForm.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch(
+            'apps.authentication.forms.authenticate',
+            wraps=authenticate
+        )
+        self.authenticate = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def _form(self, password):
+        return CustomAuthenticationForm(data={
+            'username': 'test@example.com',
+            'password': password,
+        })
+    
+    def test_repeated_bad_login_skips_authenticate(self):
+        """Test that a failed pair is rejected without re-hashing until the TTL."""
+        self.assertFalse(self._form('wrongpassword').is_valid())
+        self.assertFalse(self._form('wrongpassword').is_valid())
+        self.assertEqual(self.authenticate.call_count, 1)
+        
+        timeout = CustomAuthenticationForm.failed_login_timeout
+        with advance_clock(timeout + 1):
+            self.assertFalse(self._form('wrongpassword').is_valid())
+        self.assertEqual(self.authenticate.call_count, 2)
+    
+    def test_correct_password_not_blocked(self):
+        """Test that a failed attempt does not block the right password."""
+        self.assertFalse(self._form('wrongpassword').is_valid())
+        form = self._form('testpass123')
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.get_user(), self.user)
+        self.assertEqual(self.authenticate.call_count, 2)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS)
+class DeleteExpiredSessionsTest(TestCase):
+    """
+    Test cases for delete_expired_sessions.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    def test_deletes_across_batches(self):
+        """Test that every expired row is deleted when it takes several batches."""
+        UserSession.objects.bulk_create([
+            UserSession(user=self.user, session_key=f'key{i}', ip_address='127.0.0.1')
+            for i in range(6)
+        ])
+        # last_activity is auto_now; update() sets it without touching it
+        UserSession.objects.exclude(session_key='key5').update(
+            last_activity=timezone.now() - timedelta(days=31)
+        )
+        
+        # Three (SELECT pks, DELETE) batches, then the empty SELECT
+        with self.assertNumQueries(7):
+            deleted = delete_expired_sessions(days=30, batch_size=2)
+        
+        self.assertEqual(deleted, 5)
+        self.assertQuerySetEqual(
+            UserSession.objects.values_list('session_key', flat=True),
+            ['key5']
+        )
+
+
+class PasswordUtilsTest(SimpleTestCase):
+    """
+    Test cases for the password generation and strength helpers.
+    """
+    
+    SPECIAL = '!@#$%^&*'
+    
+    def test_generate_random_passwords_count_and_length(self):
+        """Test that the requested number of passwords is returned, each of the given length."""
+        passwords = generate_random_passwords(5, length=16)
+        self.assertEqual(len(passwords), 5)
+        for password in passwords:
+            self.assertEqual(len(password), 16)
+        self.assertEqual(generate_random_passwords(0), [])
+    
+    def test_generate_random_passwords_character_classes(self):
+        """Test that passwords only use, and cover, the generator alphabet."""
+        characters = set(''.join(generate_random_passwords(200)))
+        alphabet = set(string.ascii_letters + string.digits + self.SPECIAL)
+        self.assertLessEqual(characters, alphabet)
+        for character_class in (
+            string.ascii_uppercase, string.ascii_lowercase,
+            string.digits, self.SPECIAL
+        ):
+            self.assertTrue(characters & set(character_class), character_class)
+    
+    def test_generate_random_passwords_rejects_biased_bytes(self):
+        """Test that bytes above the last full alphabet cycle are dropped."""
+        # The 70-character alphabet fits 3 times in 256: bytes >= 210 are dropped
+        with mock.patch('apps.authentication.utils.secrets.token_bytes', side_effect=[
+            bytes([0, 255, 1, 210, 250, 251, 252, 253]),
+            bytes([69, 209, 254, 255]),
+        ]) as token_bytes:
+            self.assertEqual(generate_random_passwords(1, length=4), ['ab**'])
+        self.assertEqual(
+            [call.args for call in token_bytes.call_args_list],
+            [(8,), (4,)]
+        )
+    
+    def test_validate_password_strength(self):
+        """Test each strength error message."""
+        cases = {
+            'Abcdefg1!': [],
+            'Ab1!': ["Password must be at least 8 characters long."],
+            'abcdefg1!': ["Password must contain at least one uppercase letter."],
+            'ABCDEFG1!': ["Password must contain at least one lowercase letter."],
+            'Abcdefgh!': ["Password must contain at least one digit."],
+            'Abcdefgh1': ["Password must contain at least one special character."],
+            '': [
+                "Password must be at least 8 characters long.",
+                "Password must contain at least one uppercase letter.",
+                "Password must contain at least one lowercase letter.",
+                "Password must contain at least one digit.",
+                "Password must contain at least one special character.",
+            ],
+        }
+        for password, errors in cases.items():
+            with self.subTest(password=password):
+                self.assertEqual(validate_password_strength(password), errors)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS, CACHES=LOCMEM_CACHES)
+class RecordUserSessionTest(TestCase):
+    """
+    Test cases for the login session record (record_user_session task).
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123',
+            first_name='Test',
+            last_name='User'
+        )
+    
+    def setUp(self):
+        cache.clear()
+        # Run Celery tasks in-process
+        conf = current_app.conf
+        self.addCleanup(setattr, conf, 'task_always_eager', conf.task_always_eager)
+        conf.task_always_eager = True
+    
+    def _record(self, ip_address='127.0.0.1'):
+        record_user_session.delay(
+            self.user.pk, 'session-key', ip_address, 'Test User Agent'
+        )
+    
+    def test_first_login(self):
+        """Test that a login records an active session once the transaction commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('authentication:login'), {
+                'username': 'test@example.com',
+                'password': 'testpass123',
+            }, HTTP_USER_AGENT='Test User Agent')
+        
+        session = UserSession.objects.get()
+        self.assertEqual(session.user, self.user)
+        self.assertEqual(session.session_key, self.client.session.session_key)
+        self.assertEqual(session.ip_address, '127.0.0.1')
+        self.assertEqual(session.user_agent, 'Test User Agent')
+        self.assertTrue(session.is_active)
+    
+    def test_repeat_login_within_debounce(self):
+        """Test that a login on a fresh session row writes nothing."""
+        self._record()
+        before = UserSession.objects.values_list('last_activity', 'ip_address').get()
+        
+        # The UPDATE matches no row; the INSERT is ignored on conflict
+        with self.assertNumQueries(2):
+            self._record(ip_address='10.0.0.1')
+        
+        self.assertEqual(
+            UserSession.objects.values_list('last_activity', 'ip_address').get(),
+            before
+        )
+    
+    def test_login_on_stale_session(self):
+        """Test that a login refreshes a row idle for more than the debounce."""
+        self._record()
+        stale = timezone.now() - timedelta(hours=2)
+        UserSession.objects.update(last_activity=stale)
+        
+        self._record()
+        
+        self.assertGreater(UserSession.objects.get().last_activity, stale)
+    
+    def test_login_after_deactivation(self):
+        """Test that a login reactivates a deactivated session row."""
+        self._record()
+        UserSession.objects.update(is_active=False)
+        
+        self._record()
+        
+        session = UserSession.objects.get()
+        self.assertTrue(session.is_active)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_PASSWORD_HASHERS, CACHES=LOCMEM_CACHES)
+class RateLimitTest(TestCase):
+    """
+    Test cases for the rate_limit decorator.
+    """
+    
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+    
+    def _post(self, view, data=None, **kwargs):
+        return view(self.factory.post('/', data or {}, **kwargs))
+    
+    def test_limit_exceeded(self):
+        """Test that requests over the limit within the period get a 429."""
+        view = rate_limit(2, period=60)(_ok_view)
+        self.assertEqual(self._post(view).status_code, 200)
+        self.assertEqual(self._post(view).status_code, 200)
+        
+        response = self._post(view)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.content, b'Too many requests. Please try again later.')
+    
+    def test_limit_exceeded_json(self):
+        """Test that API callers get a JSON 429."""
+        view = rate_limit(1, period=60)(_ok_view)
+        self._post(view, content_type='application/json')
+        
+        response = self._post(view, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertJSONEqual(response.content, {'error': 'Too many requests'})
+    
+    def test_get_not_counted(self):
+        """Test that only POST requests are counted."""
+        view = rate_limit(1, period=60)(_ok_view)
+        for _ in range(3):
+            self.assertEqual(view(self.factory.get('/')).status_code, 200)
+        self.assertEqual(self._post(view).status_code, 200)
+    
+    def test_counter_resets_after_period(self):
+        """Test that the counter starts over once the window has expired."""
+        view = rate_limit(1, period=60)(_ok_view)
+        self._post(view)
+        self.assertEqual(self._post(view).status_code, 429)
+        
+        with advance_clock(61):
+            self.assertEqual(self._post(view).status_code, 200)
+            self.assertEqual(self._post(view).status_code, 429)
+    
+    def test_email_key_normalised(self):
+        """Test that key='email' counts case and whitespace variants together."""
+        view = rate_limit(1, period=60, key='email')(_ok_view)
+        self._post(view, {'username': 'test@example.com'})
+        
+        response = self._post(view, {'username': '  Test@Example.COM '})
+        self.assertEqual(response.status_code, 429)
+        response = self._post(view, {'username': 'other@example.com'})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_email_key_json_body(self):
+        """Test that key='email' reads the email of a JSON body."""
+        view = rate_limit(1, period=60, key='email')(_ok_view)
+        self._post(view, {'email': 'Test@Example.com'}, content_type='application/json')
+        
+        response = self._post(
+            view, {'email': 'test@example.com'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 429)
+    
+    def test_api_login_parses_body_once(self):
+        """Test that the rate limiter and api_login share one decoded body."""
+        with mock.patch('orjson.loads', wraps=orjson.loads) as loads, \
+                mock.patch('json.loads', wraps=json.loads) as json_loads:
+            response = self.client.post(
+                reverse('authentication:api_login'),
+                {'email': 'test@example.com', 'password': 'wrongpassword'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(loads.call_count + json_loads.call_count, 1)
+
+
+@override_settings(TRUSTED_PROXIES=['10.0.0.1', '10.0.0.2', '2001:db8::2'])
+class GetClientIpTest(SimpleTestCase):
+    """
+    Test cases for get_client_ip and the X-Forwarded-For walk.
+    """
+    
+    def setUp(self):
+        self.factory = RequestFactory()
+    
+    def _client_ip(self, remote_addr, forwarded_for=None):
+        extra = {'REMOTE_ADDR': remote_addr}
+        if forwarded_for is not None:
+            extra['HTTP_X_FORWARDED_FOR'] = forwarded_for
+        return get_client_ip(self.factory.get('/', **extra))
+    
+    def test_untrusted_remote_addr(self):
+        """Test that the header is ignored when the peer is not a trusted proxy."""
+        self.assertEqual(self._client_ip('203.0.113.9', '198.51.100.7'), '203.0.113.9')
+    
+    def test_no_header(self):
+        """Test that a trusted proxy without the header is the client."""
+        self.assertEqual(self._client_ip('10.0.0.1'), '10.0.0.1')
+    
+    def test_walks_right_to_left(self):
+        """Test that trusted hops are skipped and a spoofed leftmost entry is ignored."""
+        self.assertEqual(
+            self._client_ip('10.0.0.1', '1.2.3.4, 198.51.100.7, 10.0.0.2'),
+            '198.51.100.7'
+        )
+    
+    def test_every_hop_trusted(self):
+        """Test that the peer address is returned when every hop is trusted."""
+        self.assertEqual(self._client_ip('10.0.0.1', '10.0.0.2, 10.0.0.1'), '10.0.0.1')
+    
+    def test_garbage_entry(self):
+        """Test that the walk stops at an entry that is not an IP address."""
+        self.assertEqual(
+            self._client_ip('10.0.0.1', '198.51.100.7, not-an-ip'),
+            '10.0.0.1'
+        )
+    
+    def test_ipv6(self):
+        """Test IPv6 hops, returned in normalised form."""
+        self.assertEqual(
+            self._client_ip('2001:db8::2', '2001:DB8:0::1, 2001:db8::2'),
+            '2001:db8::1'
+        )
+    
+    def test_follows_settings(self):
+        """Test that overriding TRUSTED_PROXIES takes effect."""
+        with self.settings(TRUSTED_PROXIES=[]):
+            self.assertEqual(self._client_ip('10.0.0.1', '198.51.100.7'), '10.0.0.1')
+        self.assertEqual(self._client_ip('10.0.0.1', '198.51.100.7'), '198.51.100.7')
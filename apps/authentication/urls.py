@@ -1,4 +1,5 @@
 from django.urls import path
+from rest_framework_simplejwt.views import TokenRefreshView
 from . import views
 
 app_name = 'authentication'
@@ -20,4 +21,5 @@ urlpatterns = [
     
     # API endpoints
     path('api/login/', views.api_login, name='api_login'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='api_token_refresh'),
 ]
@@ -1,23 +1,100 @@
+import ipaddress
 import secrets
 import string
+from functools import lru_cache
+import orjson
 from django.contrib.auth.tokens import default_token_generator
-from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.db import transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.utils.functional import Promise
 
 User = get_user_model()
 
+_PASSWORD_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+# Byte -> alphabet character table, and the high bytes rejected to keep
+# the mapping uniform
+_PASSWORD_TABLE = bytes(
+    ord(_PASSWORD_ALPHABET[b % len(_PASSWORD_ALPHABET)]) for b in range(256)
+)
+_PASSWORD_REJECTED = bytes(range(256 - 256 % len(_PASSWORD_ALPHABET), 256))
+
+# Cache entry for the user data returned by api_login
+USER_PAYLOAD_CACHE_KEY = 'user:payload:{user_id}'
+USER_PAYLOAD_CACHE_TIMEOUT = 300
+
+# Character classes for validate_password_strength
+_SPECIAL_CHARS = frozenset("!@#$%^&*()_+-=[]{}|;:,.<>?")
+_UPPER, _LOWER, _DIGIT, _SPECIAL = 1, 2, 4, 8
+_ALL_CLASSES = _UPPER | _LOWER | _DIGIT | _SPECIAL
+
+
+def _orjson_default(obj):
+    # Lazy translation strings
+    if isinstance(obj, Promise):
+        return str(obj)
+    raise TypeError
+
+
+class OrjsonResponse(HttpResponse):
+    """
+    JSON response serialized with orjson.
+    
+    orjson serializes list subclasses from their raw storage, so form
+    errors must be passed through ``form_errors()`` rather than as
+    ``form.errors``.
+    """
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(orjson.dumps(data, default=_orjson_default), **kwargs)
+
+
+def parse_json_body(request):
+    """
+    Decode the JSON request body with orjson, memoized on the request so
+    the rate limiter and the view parse it only once.
+    
+    Raises ``orjson.JSONDecodeError`` (a ``ValueError``) on invalid JSON.
+    """
+    data = getattr(request, '_json_body', None)
+    if data is None:
+        data = orjson.loads(request.body)
+        request._json_body = data
+    return data
+
+
+def form_errors(form):
+    """
+    Return ``form.errors`` as plain dicts and lists of messages.
+    """
+    return {field: list(errors) for field, errors in form.errors.items()}
+
 
 def generate_random_password(length=12):
     """
     Generate a secure random password.
     """
-    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    password = ''.join(secrets.choice(alphabet) for _ in range(length))
-    return password
+    return ''.join(secrets.choice(_PASSWORD_ALPHABET) for _ in range(length))
+
+
+def generate_random_passwords(count, length=12):
+    """
+    Generate ``count`` secure random passwords for bulk flows.
+    
+    Random bytes are drawn in bulk and mapped onto the alphabet with
+    ``bytes.translate``; bytes that would bias the modulo are dropped
+    (rejection sampling).
+    """
+    needed = count * length
+    buffer = bytearray()
+    while len(buffer) < needed:
+        chunk = secrets.token_bytes(2 * (needed - len(buffer)))
+        buffer += chunk.translate(_PASSWORD_TABLE, _PASSWORD_REJECTED)
+    
+    text = buffer[:needed].decode('ascii')
+    return [text[i:i + length] for i in range(0, needed, length)]
 
 
 def generate_username_from_email(email):
@@ -27,52 +104,68 @@ def generate_username_from_email(email):
     return email.split('@')[0].lower()
 
 
+@lru_cache(maxsize=None)
+def _trusted_proxies():
+    return frozenset(getattr(settings, 'TRUSTED_PROXIES', ()))
+
+
+def get_client_ip(request):
+    """
+    Get the client IP address from the request.
+    
+    X-Forwarded-For is only honoured when the request comes from one of
+    ``settings.TRUSTED_PROXIES``. It is then walked right to left,
+    skipping the trusted hops, and the first other entry is returned if
+    it is a valid IP address. A client can prepend anything to the
+    header, so its leftmost entry is never trusted blindly.
+    """
+    remote_addr = request.META.get('REMOTE_ADDR')
+    trusted = _trusted_proxies()
+    if remote_addr not in trusted:
+        return remote_addr
+    
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    for hop in reversed(x_forwarded_for.split(',')):
+        hop = hop.strip()
+        if hop in trusted:
+            continue
+        try:
+            return str(ipaddress.ip_address(hop))
+        except ValueError:
+            break
+    return remote_addr
+
+
 def send_password_reset_email(user, request):
     """
     Send password reset email to user.
+    
+    The reset URL is built from the request here; rendering and SMTP are
+    done by a Celery task queued once the current transaction commits.
     """
+    from .tasks import send_password_reset_email_task
+    
     token = default_token_generator.make_token(user)
-    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    uid = urlsafe_base64_encode(str(user.pk).encode())
     
     reset_url = request.build_absolute_uri(
         f'/auth/password-reset-confirm/{uid}/{token}/'
     )
     
-    subject = 'Password Reset - ETL Platform'
-    message = render_to_string('authentication/emails/password_reset.html', {
-        'user': user,
-        'reset_url': reset_url,
-        'site_name': 'ETL Platform'
-    })
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-        html_message=message
+    transaction.on_commit(
+        lambda: send_password_reset_email_task.delay(user.pk, reset_url)
     )
 
 
 def send_welcome_email(user):
     """
     Send welcome email to new user.
+    
+    Queued as a Celery task once the current transaction commits.
     """
-    subject = 'Welcome to ETL Platform'
-    message = render_to_string('authentication/emails/welcome.html', {
-        'user': user,
-        'site_name': 'ETL Platform'
-    })
-    
-    send_mail(
-        subject,
-        message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        fail_silently=False,
-        html_message=message
-    )
+    from .tasks import send_welcome_email_task
+    
+    transaction.on_commit(lambda: send_welcome_email_task.delay(user.pk))
 
 
 def validate_password_strength(password):
@@ -84,17 +177,30 @@ def validate_password_strength(password):
     if len(password) < 8:
         errors.append("Password must be at least 8 characters long.")
     
-    if not any(c.isupper() for c in password):
+    # Single pass collecting character classes as bit flags
+    flags = 0
+    for c in password:
+        if c.isupper():
+            flags |= _UPPER
+        elif c.islower():
+            flags |= _LOWER
+        elif c.isdigit():
+            flags |= _DIGIT
+        elif c in _SPECIAL_CHARS:
+            flags |= _SPECIAL
+        if flags == _ALL_CLASSES:
+            break
+    
+    if not flags & _UPPER:
         errors.append("Password must contain at least one uppercase letter.")
     
-    if not any(c.islower() for c in password):
+    if not flags & _LOWER:
         errors.append("Password must contain at least one lowercase letter.")
     
-    if not any(c.isdigit() for c in password):
+    if not flags & _DIGIT:
         errors.append("Password must contain at least one digit.")
     
-    special_chars = "!@#$%^&*()_+-=[]{}|;:,.<>?"
-    if not any(c in special_chars for c in password):
+    if not flags & _SPECIAL:
         errors.append("Password must contain at least one special character.")
     
     return errors
@@ -104,6 +210,9 @@ def check_user_permissions(user, required_permissions):
     """
     Check if user has required ETL permissions.
     
+    Only ``is_superuser`` and the ETL permission flags are read, so users
+    loaded with ``User.objects.for_permission_check()`` need no extra query.
+    
     Args:
         user: CustomUser instance
         required_permissions: list of permission strings
@@ -117,17 +226,19 @@ def check_user_permissions(user, required_permissions):
     if user.is_superuser:
         return True
     
-    for permission in required_permissions:
-        if not user.has_etl_permission(permission):
-            return False
-    
-    return True
+    return all(user.has_etl_permission(p) for p in required_permissions)
 
 
 def get_user_role_display(user):
     """
     Get a human-readable role display for the user.
+    
+    Users loaded with ``User.objects.with_role()`` already carry the value.
     """
+    role = getattr(user, 'role', None)
+    if role is not None:
+        return role
+    
     if user.is_superuser:
         return "Super Administrator"
     elif user.is_staff:
@@ -146,9 +257,6 @@ def create_user_with_profile(email, first_name, last_name, **kwargs):
     """
     Create a user with associated profile in a single transaction.
     """
-    from django.db import transaction
-    from .models import UserProfile
-    
     with transaction.atomic():
         user = User.objects.create_user(
             email=email,
@@ -157,24 +265,47 @@ def create_user_with_profile(email, first_name, last_name, **kwargs):
             **kwargs
         )
         
-        # Profile is created automatically via signals
-        # but we can customize it here if needed
-        profile = user.profile
-        profile.save()
+        # Profile is created automatically via signals; customize it here
+        # with profile.save(update_fields=[...]) if needed
         
         return user
 
 
+def bulk_create_users_with_profiles(users_data, batch_size=500):
+    """
+    Create many users and their profiles with batched INSERTs.
+    
+    ``users_data`` items are dicts as accepted by
+    ``User.objects.create_users_bulk``. ``bulk_create`` sends no
+    ``post_save`` signal, so the profiles are inserted here in one batch
+    instead of one query per user.
+    """
+    from .models import UserProfile
+    
+    with transaction.atomic():
+        users = User.objects.create_users_bulk(users_data, batch_size=batch_size)
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user) for user in users],
+            batch_size=batch_size
+        )
+        return users
+
+
 def deactivate_user_sessions(user):
     """
     Deactivate all active sessions for a user.
+    
+    The filter is served by the partial index on active sessions, so the
+    cost follows the number of active sessions, not the session history.
     """
+    from django.utils import timezone
     from .models import UserSession
     
+    # update() bypasses auto_now, so last_activity is set explicitly
     UserSession.objects.filter(
         user=user,
         is_active=True
-    ).update(is_active=False)
+    ).update(is_active=False, last_activity=timezone.now())
 
 
 def get_user_activity_summary(user, days=30):
@@ -182,19 +313,52 @@ def get_user_activity_summary(user, days=30):
     Get user activity summary for the last N days.
     """
     from django.utils import timezone
+    from django.db.models import Count, Q
     from datetime import timedelta
     from .models import UserSession
     
     start_date = timezone.now() - timedelta(days=days)
     
-    sessions = UserSession.objects.filter(
+    stats = UserSession.objects.filter(
         user=user,
         created_at__gte=start_date
+    ).aggregate(
+        total_sessions=Count('id'),
+        active_sessions=Count('id', filter=Q(is_active=True)),
+        unique_ips=Count('ip_address', distinct=True),
     )
     
     return {
-        'total_sessions': sessions.count(),
-        'active_sessions': sessions.filter(is_active=True).count(),
+        'total_sessions': stats['total_sessions'],
+        'active_sessions': stats['active_sessions'],
         'last_login': user.last_login,
-        'unique_ips': sessions.values('ip_address').distinct().count(),
+        'unique_ips': stats['unique_ips'],
     }
+
+
+def delete_expired_sessions(days=30, batch_size=5000):
+    """
+    Delete sessions inactive for more than ``days`` days.
+    
+    Rows are removed in batches of at most ``batch_size`` primary keys so
+    each DELETE stays short and never locks the whole table.
+    
+    Returns:
+        int: number of deleted sessions
+    """
+    from django.utils import timezone
+    from datetime import timedelta
+    from .models import UserSession
+    
+    cutoff_date = timezone.now() - timedelta(days=days)
+    expired_sessions = UserSession.objects.filter(last_activity__lt=cutoff_date)
+    
+    total_deleted = 0
+    while True:
+        batch = list(expired_sessions.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            break
+        deleted_count, _ = UserSession.objects.filter(pk__in=batch).delete()
+        total_deleted += deleted_count
+    
+    return total_deleted
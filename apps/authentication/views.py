@@ -5,18 +5,27 @@ from django.contrib import messages
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, TemplateView
 from django.utils.decorators import method_decorator
-from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-import json
+from django.core.cache import cache
+import orjson
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from .decorators import rate_limit
 from .forms import (
     CustomUserCreationForm,
     CustomAuthenticationForm,
     UserProfileForm,
     PasswordChangeForm
 )
-from .models import CustomUser, UserProfile, UserSession
+from .models import CustomUser, UserProfile, UserSession, ETL_PERMISSION_FIELDS
+from .utils import (
+    OrjsonResponse,
+    form_errors,
+    parse_json_body,
+    USER_PAYLOAD_CACHE_KEY,
+    USER_PAYLOAD_CACHE_TIMEOUT
+)
 
 
 class RegisterView(CreateView):
@@ -44,6 +53,8 @@ class RegisterView(CreateView):
         return super().form_invalid(form)
 
 
+@rate_limit(10, key='ip')
+@rate_limit(5, key='email')
 def login_view(request):
     """
     Custom login view using email authentication.
@@ -55,16 +66,9 @@ def login_view(request):
         form = CustomAuthenticationForm(data=request.POST)
         if form.is_valid():
             user = form.get_user()
+            # The session record is queued by user_logged_in_handler
             login(request, user)
             
-            # Create user session record
-            UserSession.objects.create(
-                user=user,
-                session_key=request.session.session_key,
-                ip_address=get_client_ip(request),
-                user_agent=request.META.get('HTTP_USER_AGENT', '')
-            )
-            
             messages.success(request, f'Welcome back, {user.get_short_name()}!')
             
             # Redirect to next page or dashboard
@@ -83,22 +87,26 @@ def logout_view(request):
     """
     Logout view that handles session cleanup.
     """
-    # Mark user session as inactive
-    try:
-        session = UserSession.objects.get(
-            user=request.user,
-            session_key=request.session.session_key
-        )
-        session.is_active = False
-        session.save()
-    except UserSession.DoesNotExist:
-        pass
-    
+    # The session record is marked inactive by user_logged_out_handler
     logout(request)
     messages.success(request, 'You have been successfully logged out.')
     return redirect('authentication:login')
 
 
+def _get_profile(user):
+    """
+    Return the user's profile through the one-to-one accessor.
+    
+    Profiles are created by the ``create_user_profile`` signal; the
+    fallback only covers users inserted without it (e.g. bulk_create).
+    """
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        profile, created = UserProfile.objects.get_or_create(user=user)
+        return profile
+
+
 @method_decorator(login_required, name='dispatch')
 class ProfileView(TemplateView):
     """
@@ -110,8 +118,7 @@ class ProfileView(TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Get or create user profile
-        profile, created = UserProfile.objects.get_or_create(user=user)
+        profile = _get_profile(user)
         
         context.update({
             'user': user,
@@ -128,25 +135,30 @@ def update_profile(request):
     Update user profile information via AJAX.
     """
     if request.method == 'POST':
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
+        profile = _get_profile(request.user)
         form = UserProfileForm(request.POST, request.FILES, instance=profile)
         
         if form.is_valid():
-            form.save()
-            return JsonResponse({
+            # Only write the columns the user actually changed
+            if form.has_changed():
+                form.save(commit=False).save(
+                    update_fields=[*form.changed_data, 'updated_at']
+                )
+            return OrjsonResponse({
                 'success': True,
                 'message': 'Profile updated successfully!'
             })
         else:
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': False,
-                'errors': form.errors
+                'errors': form_errors(form)
             })
     
-    return JsonResponse({'success': False, 'message': 'Invalid request method'})
+    return OrjsonResponse({'success': False, 'message': 'Invalid request method'})
 
 
 @login_required
+@rate_limit(5, key='user')
 def change_password(request):
     """
     Change user password via AJAX.
@@ -160,17 +172,17 @@ def change_password(request):
             from django.contrib.auth import update_session_auth_hash
             update_session_auth_hash(request, request.user)
             
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': True,
                 'message': 'Password changed successfully!'
             })
         else:
-            return JsonResponse({
+            return OrjsonResponse({
                 'success': False,
-                'errors': form.errors
+                'errors': form_errors(form)
             })
     
-    return JsonResponse({'success': False, 'message': 'Invalid request method'})
+    return OrjsonResponse({'success': False, 'message': 'Invalid request method'})
 
 
 @login_required
@@ -178,8 +190,10 @@ def user_sessions(request):
     """
     View user's active sessions for security monitoring.
     """
-    sessions = UserSession.objects.filter(
-        user=request.user,
+    # Going through the reverse manager sets session.user to request.user
+    # without a query; the filter and ordering are served by the partial
+    # index on active sessions
+    sessions = request.user.sessions.filter(
         is_active=True
     ).order_by('-last_activity')
     
@@ -194,84 +208,89 @@ def revoke_session(request, session_id):
     """
     Revoke a specific user session.
     """
-    try:
-        session = UserSession.objects.get(
-            id=session_id,
-            user=request.user
-        )
-        session.is_active = False
-        session.save()
-        
+    updated = UserSession.objects.filter(
+        id=session_id,
+        user=request.user
+    ).update(is_active=False, last_activity=timezone.now())
+    
+    if updated:
         messages.success(request, 'Session revoked successfully.')
-    except UserSession.DoesNotExist:
+    else:
         messages.error(request, 'Session not found.')
     
     return redirect('authentication:sessions')
 
 
-def get_client_ip(request):
+def _user_payload(user):
     """
-    Get the client IP address from the request.
+    User data returned by api_login; cached per user and invalidated by
+    the ``invalidate_user_payload`` signal.
     """
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+    return {
+        'id': user.id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'permissions': {
+            field: getattr(user, field) for field in ETL_PERMISSION_FIELDS.values()
+        }
+    }
 
 
 # API Views for mobile/external authentication
 @csrf_exempt
+@rate_limit(10, key='ip')
+@rate_limit(5, key='email')
 def api_login(request):
     """
     API endpoint for authentication (for mobile apps or external services).
+    
+    Returns a JWT access/refresh pair; refresh at ``api/token/refresh/``.
     """
     if request.method == 'POST':
         try:
-            data = json.loads(request.body)
+            data = parse_json_body(request)
             email = data.get('email')
             password = data.get('password')
             
             if not email or not password:
-                return JsonResponse({
+                return OrjsonResponse({
                     'success': False,
                     'message': 'Email and password are required'
                 }, status=400)
             
             user = authenticate(username=email, password=password)
             if user:
-                # Generate or get user token (you might want to use DRF tokens)
-                return JsonResponse({
+                payload = cache.get_or_set(
+                    USER_PAYLOAD_CACHE_KEY.format(user_id=user.pk),
+                    lambda: _user_payload(user),
+                    USER_PAYLOAD_CACHE_TIMEOUT
+                )
+                refresh = RefreshToken.for_user(user)
+                return OrjsonResponse({
                     'success': True,
                     'message': 'Login successful',
-                    'user': {
-                        'id': user.id,
-                        'email': user.email,
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'permissions': {
-                            'can_create_pipelines': user.can_create_pipelines,
-                            'can_modify_pipelines': user.can_modify_pipelines,
-                            'can_execute_pipelines': user.can_execute_pipelines,
-                            'can_view_monitoring': user.can_view_monitoring,
-                            'can_manage_connectors': user.can_manage_connectors,
-                        }
+                    'user': payload,
+                    # Clients send "Authorization: Bearer <access>" on later
+                    # calls instead of re-posting the password
+                    'tokens': {
+                        'access': str(refresh.access_token),
+                        'refresh': str(refresh),
                     }
                 })
             else:
-                return JsonResponse({
+                return OrjsonResponse({
                     'success': False,
                     'message': 'Invalid credentials'
                 }, status=401)
                 
-        except json.JSONDecodeError:
-            return JsonResponse({
+        except orjson.JSONDecodeError:
+            return OrjsonResponse({
                 'success': False,
                 'message': 'Invalid JSON data'
             }, status=400)
     
-    return JsonResponse({
+    return OrjsonResponse({
         'success': False,
         'message': 'Method not allowed'
     }, status=405)
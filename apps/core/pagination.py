@@ -0,0 +1,16 @@
+from rest_framework.pagination import CursorPagination
+
+
+class DefaultCursorPagination(CursorPagination):
+    """
+    Keyset pagination used as the DRF default.
+
+    Pages are fetched with ``WHERE pk < last_seen`` instead of an OFFSET,
+    so deep pages cost the same as the first one. Views needing another
+    ordering set ``ordering`` on a subclass; it must be unique and
+    indexed. Views that really need page numbers set
+    ``pagination_class = PageNumberPagination``.
+    """
+
+    # The CursorPagination default ("-created") is not a field on every model
+    ordering = "-pk"
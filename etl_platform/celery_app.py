@@ -4,6 +4,7 @@ Celery configuration for etl_platform project.
 
 import os
 from celery import Celery
+from celery.schedules import crontab
 from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
@@ -25,21 +26,33 @@ app.conf.task_routes = {
     'apps.tasks.load.*': {'queue': 'load'},
     'apps.execution.*': {'queue': 'execution'},
     'apps.monitoring.*': {'queue': 'monitoring'},
+    'apps.authentication.tasks.*': {'queue': 'auth'},
 }
 
 # Celery beat schedule
+# crontab entries run on wall-clock boundaries instead of drifting from
+# beat's start time; 'expires' (seconds) drops runs left queued too long,
+# so lagging workers don't build up a backlog
 app.conf.beat_schedule = {
     'cleanup-old-logs': {
         'task': 'apps.monitoring.tasks.cleanup_old_logs',
-        'schedule': 3600.0,  # Run every hour
+        'schedule': crontab(minute=0),  # Every hour
+        'options': {'expires': 3600},
     },
     'health-check': {
         'task': 'apps.monitoring.tasks.health_check',
-        'schedule': 300.0,  # Run every 5 minutes
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        'options': {'expires': 60},
     },
     'update-pipeline-metrics': {
         'task': 'apps.monitoring.tasks.update_pipeline_metrics',
-        'schedule': 600.0,  # Run every 10 minutes
+        'schedule': crontab(minute='*/10'),  # Every 10 minutes
+        'options': {'expires': 600},
+    },
+    'cleanup-expired-sessions': {
+        'task': 'apps.authentication.tasks.cleanup_expired_sessions',
+        'schedule': crontab(minute='7-59/15'),  # Every 15 minutes, off the hour
+        'options': {'expires': 900},
     },
 }
 
@@ -0,0 +1,127 @@
+"""
+Non-blocking logging for etl_platform.
+
+Used as ``LOGGING_CONFIG`` in production: after the usual ``dictConfig``,
+the handlers of every configured logger are moved behind a
+``QueueHandler``, so request threads only enqueue records and a single
+``QueueListener`` thread does the formatting and the file/syslog I/O.
+
+Forking servers (e.g. gunicorn with ``--preload``) configure logging in
+the master: the workers inherit the queue handlers but not the listener
+thread, so each child starts its own listener on a fresh queue right
+after the fork.
+"""
+
+import atexit
+import copy
+import logging
+import logging.config
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# Listener of the current process and the queue handlers feeding it
+_listener = None
+_queue_handlers = []
+
+
+class _RoutingQueueHandler(QueueHandler):
+    """
+    Queue handler standing in for one logger's handlers: each record is
+    queued along with the handlers it must be passed to.
+    """
+
+    def __init__(self, log_queue, handlers):
+        super().__init__(log_queue)
+        self.targets = tuple(handlers)
+
+    def prepare(self, record):
+        # Merge the arguments into the message, as they may be mutated
+        # once the call returns, but keep exc_info and stack_info: the
+        # records never leave the process, and the target formatters (JSON
+        # in production) render the traceback as a separate field
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        self.queue.put_nowait((self.targets, record))
+
+
+class _RoutingQueueListener(QueueListener):
+    """
+    Listener shared by every configured logger, passing each record to
+    the handlers it was queued with.
+    """
+
+    def handle(self, item):
+        targets, record = item
+        for handler in targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _start_listener():
+    global _listener
+
+    log_queue = queue.SimpleQueue()
+    for handler in _queue_handlers:
+        handler.queue = log_queue
+    _listener = _RoutingQueueListener(log_queue)
+    _listener.start()
+
+
+def _stop_listener():
+    """
+    Process the records still queued, then stop the listener thread.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_in_child():
+    # The listener thread doesn't survive the fork; records queued before
+    # it are left to the parent
+    global _listener
+
+    if _listener is not None:
+        _listener = None
+        _start_listener()
+
+
+# Flush the pending records on interpreter exit
+atexit.register(_stop_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def _enqueue_handlers(logger):
+    handlers = logger.handlers[:]
+    if handlers:
+        queue_handler = _RoutingQueueHandler(None, handlers)
+        logger.handlers = [queue_handler]
+        _queue_handlers.append(queue_handler)
+
+
+def configure_logging(config):
+    """
+    Apply ``config`` with ``dictConfig``, then hand each configured
+    logger's (and the root logger's) handlers to the background listener.
+    """
+    _stop_listener()
+    _queue_handlers.clear()
+
+    logging.config.dictConfig(config)
+
+    for name in config.get("loggers", {}):
+        _enqueue_handlers(logging.getLogger(name))
+    if "root" in config:
+        _enqueue_handlers(logging.getLogger())
+
+    if _queue_handlers:
+        _start_listener()
@@ -6,7 +6,7 @@ from .base import *
 
 DEBUG = False
 
-ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
+ALLOWED_HOSTS = env_list("ALLOWED_HOSTS")
 
 # Add WhiteNoise middleware for static files serving
 MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
@@ -39,9 +39,12 @@ DATABASES = {
         "OPTIONS": {
             "sslmode": "require",
             "connect_timeout": 60,
-            "options": "-c statement_timeout=30000"  # 30 seconds
+            "options": "-c statement_timeout=30000",  # 30 seconds
+            # Never land on a read-only replica when HOST lists several
+            "target_session_attrs": "read-write",
         },
         "CONN_MAX_AGE": 600,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
@@ -54,8 +57,16 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "noreply@etl-platform.com")
 
-# Static files for production with WhiteNoise
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Static files for production with WhiteNoise: hashed names plus gzip and
+# (with the brotli package installed) .br files built at collectstatic
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Logging for production - structured JSON logs
 LOGGING["formatters"]["json"] = {
@@ -70,13 +81,18 @@ LOGGING["handlers"]["syslog"] = {
     "formatter": "json",
 }
 
-# Add syslog to all loggers in production
-for logger_config in LOGGING["loggers"].values():
-    if "syslog" not in logger_config["handlers"]:
-        logger_config["handlers"].append("syslog")
+# Add syslog to all loggers in production (new handler lists, so the
+# lists defined in base.py are not mutated)
+LOGGING["loggers"] = {
+    name: {**logger_config, "handlers": [*logger_config["handlers"], "syslog"]}
+    for name, logger_config in LOGGING["loggers"].items()
+}
+
+# Log records are queued; file/syslog I/O runs on a listener thread
+LOGGING_CONFIG = "etl_platform.log_queue.configure_logging"
 
 # CORS settings for production
-CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")
+CORS_ALLOWED_ORIGINS = env_list("CORS_ALLOWED_ORIGINS")
 CORS_ALLOW_CREDENTIALS = True
 
 # Production-specific ETL settings
@@ -6,7 +6,7 @@ from .base import *
 
 DEBUG = True  # Enable debug in staging for testing
 
-ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "staging.etl-platform.com").split(",")
+ALLOWED_HOSTS = env_list("ALLOWED_HOSTS", "staging.etl-platform.com")
 
 # Add WhiteNoise middleware for static files serving in staging
 MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
@@ -24,6 +24,7 @@ DATABASES = {
             "connect_timeout": 60,
         },
         "CONN_MAX_AGE": 300,
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
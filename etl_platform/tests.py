@@ -0,0 +1,78 @@
+import logging
+from django.test import SimpleTestCase
+from . import log_queue
+
+
+class CaptureHandler(logging.Handler):
+    """
+    Handler keeping the records it receives, with their formatted output.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, record):
+        self.records.append((record, self.format(record)))
+
+
+class ConfigureLoggingTest(SimpleTestCase):
+    """
+    Test cases for the queued logging configuration.
+    """
+
+    def setUp(self):
+        self.first = CaptureHandler()
+        self.second = CaptureHandler()
+        log_queue.configure_logging({
+            'version': 1,
+            'disable_existing_loggers': False,
+            'handlers': {
+                'first': {'()': lambda: self.first},
+                'second': {'()': lambda: self.second},
+            },
+            'loggers': {
+                'etl_platform.tests.first': {
+                    'handlers': ['first'],
+                    'level': 'INFO',
+                    'propagate': False,
+                },
+                'etl_platform.tests.second': {
+                    'handlers': ['second'],
+                    'level': 'INFO',
+                    'propagate': False,
+                },
+            },
+        })
+        self.addCleanup(log_queue._stop_listener)
+        for name in ('etl_platform.tests.first', 'etl_platform.tests.second'):
+            self.addCleanup(setattr, logging.getLogger(name), 'handlers', [])
+
+    def test_exception_keeps_traceback(self):
+        """Test that a logged exception reaches the target handler with its traceback."""
+        try:
+            raise ValueError('bad row')
+        except ValueError:
+            logging.getLogger('etl_platform.tests.first').exception('Load failed: %s', 'orders')
+        log_queue._stop_listener()
+
+        [(record, output)] = self.first.records
+        self.assertEqual(record.getMessage(), 'Load failed: orders')
+        self.assertIs(record.exc_info[0], ValueError)
+        # The traceback is added by the target formatter, not merged upstream
+        self.assertEqual(record.msg, 'Load failed: orders')
+        self.assertIn('Traceback', output)
+        self.assertIn('ValueError: bad row', output)
+
+    def test_shared_listener_routes_records(self):
+        """Test that one listener passes each record to its own logger's handlers."""
+        logging.getLogger('etl_platform.tests.first').info('one')
+        logging.getLogger('etl_platform.tests.second').info('two')
+        log_queue._stop_listener()
+
+        self.assertEqual([output for _, output in self.first.records], ['one'])
+        self.assertEqual([output for _, output in self.second.records], ['two'])
+        queues = {handler.queue for handler in log_queue._queue_handlers}
+        self.assertEqual(len(log_queue._queue_handlers), 2)
+        self.assertEqual(len(queues), 1)
@@ -27,12 +27,14 @@ urlpatterns = [
 
 # Debug toolbar URLs (development only)
 if settings.DEBUG:
-    import debug_toolbar
     from django.conf.urls.static import static
     
-    urlpatterns = [
-        path("__debug__/", include(debug_toolbar.urls)),
-    ] + urlpatterns
+    if "debug_toolbar" in settings.INSTALLED_APPS:
+        import debug_toolbar
+        
+        urlpatterns = [
+            path("__debug__/", include(debug_toolbar.urls)),
+        ] + urlpatterns
     
     # Serve static files during development
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
@@ -1,160 +1,115 @@
 """
 Factories for generating test data using Factory Boy and Faker
+
+Factory modules are imported lazily (PEP 562): ``from factories import X``
+only loads the module defining ``X``, not Faker/factory_boy graphs for
+every app.
 """
 
-from .authentication_factories import (
-    CustomUserFactory,
-    UserProfileFactory,
-    UserSessionFactory,
-    AdminUserFactory,
-    DataEngineerFactory,
-    AnalystFactory,
-    ViewerFactory,
-)
+import importlib
 
-from .core_factories import (
-    OrganizationFactory,
-    OrganizationMembershipFactory,
-    StartupOrganizationFactory,
-    EnterpriseOrganizationFactory,
-    OrganizationWithTeamFactory,
-)
+# Factory module -> factories it defines
+_FACTORY_MODULES = {
+    'authentication_factories': (
+        'CustomUserFactory',
+        'FastCustomUserFactory',
+        'UserProfileFactory',
+        'UserSessionFactory',
+        'AdminUserFactory',
+        'DataEngineerFactory',
+        'AnalystFactory',
+        'ViewerFactory',
+    ),
+    'core_factories': (
+        'OrganizationFactory',
+        'OrganizationMembershipFactory',
+        'FastOrganizationFactory',
+        'FastOrganizationMembershipFactory',
+        'StartupOrganizationFactory',
+        'EnterpriseOrganizationFactory',
+        'OrganizationWithTeamFactory',
+    ),
+    'connectors_factories': (
+        'CredentialFactory',
+        'ConnectorFactory',
+        'DatabaseConnectorFactory',
+        'PostgreSQLConnectorFactory',
+        'MySQLConnectorFactory',
+        'APIConnectorFactory',
+        'RESTAPIConnectorFactory',
+        'FileConnectorFactory',
+        'CSVFileConnectorFactory',
+        'CloudConnectorFactory',
+        'S3ConnectorFactory',
+        'AzureBlobConnectorFactory',
+        'ConnectorSetFactory',
+    ),
+    'pipelines_factories': (
+        'PipelineFactory',
+        'PipelineStepFactory',
+        'PipelineScheduleFactory',
+        'PipelineTagFactory',
+        'PipelineTagAssignmentFactory',
+        'DataIngestionPipelineFactory',
+        'DataTransformationPipelineFactory',
+        'ReportingPipelineFactory',
+        'CompletePipelineFactory',
+    ),
+    'tasks_factories': (
+        'TaskTemplateFactory',
+        'TaskFactory',
+        'TaskParameterFactory',
+        'TaskDependencyFactory',
+        'SQLExtractionTaskFactory',
+        'PythonTransformTaskFactory',
+        'DatabaseLoadTaskFactory',
+        'TaskSetFactory',
+    ),
+    'execution_factories': (
+        'PipelineRunFactory',
+        'SuccessfulPipelineRunFactory',
+        'FailedPipelineRunFactory',
+        'LongRunningPipelineRunFactory',
+        'TaskRunFactory',
+        'ExecutionQueueFactory',
+        'ExecutionLockFactory',
+        'DataLineageFactory',
+    ),
+    'monitoring_factories': (
+        'AlertFactory',
+        'CriticalAlertFactory',
+        'PerformanceAlertFactory',
+        'DataQualityAlertFactory',
+        'MetricFactory',
+        'HealthCheckFactory',
+        'PerformanceReportFactory',
+        'NotificationChannelFactory',
+        'NotificationRuleFactory',
+        'NotificationLogFactory',
+    ),
+}
 
-from .connectors_factories import (
-    CredentialFactory,
-    ConnectorFactory,
-    DatabaseConnectorFactory,
-    PostgreSQLConnectorFactory,
-    MySQLConnectorFactory,
-    APIConnectorFactory,
-    RESTAPIConnectorFactory,
-    FileConnectorFactory,
-    CSVFileConnectorFactory,
-    CloudConnectorFactory,
-    S3ConnectorFactory,
-    AzureBlobConnectorFactory,
-    ConnectorSetFactory,
-)
+# Factory name -> module defining it
+_FACTORY_LOCATIONS = {
+    name: module
+    for module, names in _FACTORY_MODULES.items()
+    for name in names
+}
 
-from .pipelines_factories import (
-    PipelineFactory,
-    PipelineStepFactory,
-    PipelineScheduleFactory,
-    PipelineTagFactory,
-    PipelineTagAssignmentFactory,
-    DataIngestionPipelineFactory,
-    DataTransformationPipelineFactory,
-    ReportingPipelineFactory,
-    CompletePipelineFactory,
-)
+__all__ = list(_FACTORY_LOCATIONS)
 
-from .tasks_factories import (
-    TaskTemplateFactory,
-    TaskFactory,
-    TaskParameterFactory,
-    TaskDependencyFactory,
-    SQLExtractionTaskFactory,
-    PythonTransformTaskFactory,
-    DatabaseLoadTaskFactory,
-    TaskSetFactory,
-)
 
-from .execution_factories import (
-    PipelineRunFactory,
-    SuccessfulPipelineRunFactory,
-    FailedPipelineRunFactory,
-    LongRunningPipelineRunFactory,
-    TaskRunFactory,
-    ExecutionQueueFactory,
-    ExecutionLockFactory,
-    DataLineageFactory,
-)
+def __getattr__(name):
+    try:
+        module_name = _FACTORY_LOCATIONS[name]
+    except KeyError:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}') from None
+    
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
 
-from .monitoring_factories import (
-    AlertFactory,
-    CriticalAlertFactory,
-    PerformanceAlertFactory,
-    DataQualityAlertFactory,
-    MetricFactory,
-    HealthCheckFactory,
-    PerformanceReportFactory,
-    NotificationChannelFactory,
-    NotificationRuleFactory,
-    NotificationLogFactory,
-)
 
-__all__ = [
-    # Authentication
-    'CustomUserFactory',
-    'UserProfileFactory', 
-    'UserSessionFactory',
-    'AdminUserFactory',
-    'DataEngineerFactory',
-    'AnalystFactory',
-    'ViewerFactory',
-    
-    # Core
-    'OrganizationFactory',
-    'OrganizationMembershipFactory',
-    'StartupOrganizationFactory',
-    'EnterpriseOrganizationFactory',
-    'OrganizationWithTeamFactory',
-    
-    # Connectors
-    'CredentialFactory',
-    'ConnectorFactory',
-    'DatabaseConnectorFactory',
-    'PostgreSQLConnectorFactory',
-    'MySQLConnectorFactory',
-    'APIConnectorFactory',
-    'RESTAPIConnectorFactory',
-    'FileConnectorFactory',
-    'CSVFileConnectorFactory',
-    'CloudConnectorFactory',
-    'S3ConnectorFactory',
-    'AzureBlobConnectorFactory',
-    'ConnectorSetFactory',
-    
-    # Pipelines
-    'PipelineFactory',
-    'PipelineStepFactory',
-    'PipelineScheduleFactory',
-    'PipelineTagFactory',
-    'PipelineTagAssignmentFactory',
-    'DataIngestionPipelineFactory',
-    'DataTransformationPipelineFactory',
-    'ReportingPipelineFactory',
-    'CompletePipelineFactory',
-    
-    # Tasks
-    'TaskTemplateFactory',
-    'TaskFactory',
-    'TaskParameterFactory',
-    'TaskDependencyFactory',
-    'SQLExtractionTaskFactory',
-    'PythonTransformTaskFactory',
-    'DatabaseLoadTaskFactory',
-    'TaskSetFactory',
-    
-    # Execution
-    'PipelineRunFactory',
-    'SuccessfulPipelineRunFactory',
-    'FailedPipelineRunFactory',
-    'LongRunningPipelineRunFactory',
-    'TaskRunFactory',
-    'ExecutionQueueFactory',
-    'ExecutionLockFactory',
-    'DataLineageFactory',
-    
-    # Monitoring
-    'AlertFactory',
-    'CriticalAlertFactory',
-    'PerformanceAlertFactory',
-    'DataQualityAlertFactory',
-    'MetricFactory',
-    'HealthCheckFactory',
-    'PerformanceReportFactory',
-    'NotificationChannelFactory',
-    'NotificationRuleFactory',
-    'NotificationLogFactory',
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,54 @@
+"""
+Outils communs pour les insertions en masse des factories
+"""
+import os
+import factory
+from django.db import transaction
+
+# Taille des lots pour bulk_create (surchargeable via l'environnement)
+BULK_BATCH_SIZE = int(os.getenv('ETL_FACTORY_BULK_BATCH', '100'))
+
+# Réutiliser les lignes existantes pour les clés étrangères au lieu de
+# créer un utilisateur/une organisation par objet (gros jeux de données)
+REUSE_FK = os.getenv('ETL_FACTORY_REUSE_FK', '0') == '1'
+
+
+def pooled_subfactory(factory_class, queryset):
+    """
+    Parcourt ``queryset`` en boucle si REUSE_FK est actif, sinon crée
+    l'objet lié avec ``factory_class`` comme une SubFactory classique.
+    """
+    if REUSE_FK:
+        return factory.Iterator(queryset)
+    return factory.SubFactory(factory_class)
+
+
+class BulkModelFactoryMixin:
+    """
+    Ajoute ``create_batch_bulk()`` à une DjangoModelFactory : les objets
+    sont construits avec ``build_batch()`` puis insérés par lots avec
+    ``bulk_create``, au lieu d'un INSERT par ``create()``.
+    
+    Les objets étant construits (build), les SubFactory ne sont pas
+    sauvegardées : passer les clés étrangères en argument (ou activer
+    REUSE_FK). ``bulk_create`` n'envoie pas post_save et les hooks
+    post_generation ne sont pas appelés ; ``_after_bulk_create()``
+    permet de compléter les objets insérés.
+    """
+    
+    @classmethod
+    def create_batch_bulk(cls, size, batch_size=BULK_BATCH_SIZE,
+                          ignore_conflicts=False, **kwargs):
+        objects = cls.build_batch(size, **kwargs)
+        with transaction.atomic():
+            cls._meta.model.objects.bulk_create(
+                objects,
+                batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts
+            )
+            cls._after_bulk_create(objects)
+        return objects
+    
+    @classmethod
+    def _after_bulk_create(cls, objects):
+        """Traitements après insertion (rien par défaut)"""
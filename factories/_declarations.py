@@ -0,0 +1,34 @@
+"""
+Déclarations factory_boy légères, tirées directement avec le générateur
+aléatoire de factory_boy (sans passer par le dispatch des providers Faker)
+"""
+import factory.random
+from factory.declarations import BaseDeclaration
+
+
+# Générateur partagé par toutes les factories : factory.random.reseed_random()
+# le réinitialise (avec Faker), ce qui rend les données générées reproductibles
+rng = factory.random.randgen
+
+
+class Bool(BaseDeclaration):
+    """Booléen vrai avec une probabilité de ``chance_of_getting_true`` %"""
+    
+    def __init__(self, chance_of_getting_true=50):
+        super().__init__()
+        self.probability = chance_of_getting_true / 100
+    
+    def evaluate(self, instance, step, extra):
+        return rng.random() < self.probability
+
+
+class Int(BaseDeclaration):
+    """Entier aléatoire entre ``min`` et ``max`` inclus"""
+    
+    def __init__(self, min=0, max=9999):
+        super().__init__()
+        self.min = min
+        self.max = max
+    
+    def evaluate(self, instance, step, extra):
+        return rng.randint(self.min, self.max)
@@ -0,0 +1,28 @@
+"""
+Instance Faker partagée par tous les modules de factories
+"""
+from faker import Faker
+
+# Seuls les providers utilisés par les factories sont chargés (fake.* ;
+# les déclarations factory.Faker utilisent l'instance de factory_boy).
+# company/person sont requis par internet (domain_name, user_name, email).
+_PROVIDERS = [
+    'faker.providers.company',
+    'faker.providers.date_time',
+    'faker.providers.file',
+    'faker.providers.internet',
+    'faker.providers.lorem',
+    'faker.providers.misc',
+    'faker.providers.person',
+    'faker.providers.phone_number',
+    'faker.providers.user_agent',
+]
+
+# Une seule instance (chargement des providers/locales une fois) ;
+# use_weighting=False : tirages uniformes via random.choice, bien plus
+# rapides que les tirages pondérés par défaut
+fake = Faker(  # Utilisation de données en français
+    'fr_FR',
+    providers=_PROVIDERS,
+    use_weighting=False
+)
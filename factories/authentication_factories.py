@@ -1,69 +1,123 @@
 """
 Factories pour les modèles d'authentification
 """
+import secrets
+from functools import lru_cache
 import factory
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.utils import timezone
-from faker import Faker
 from apps.authentication.models import UserProfile, UserSession
-
-fake = Faker('fr_FR')  # Utilisation de données en français
+from ._faker import fake
+from ._bulk import BULK_BATCH_SIZE, BulkModelFactoryMixin
+from ._declarations import Bool, rng
 
 User = get_user_model()
 
-
-class CustomUserFactory(factory.django.DjangoModelFactory):
+DEFAULT_PASSWORD = 'testpass123'
+
+# Valeurs tirées avec rng.choice (plus rapide que Faker random_element)
+_DEPARTMENTS = (
+    'Data Engineering', 'Analytics', 'Business Intelligence', 
+    'IT Operations', 'Data Science', 'DevOps'
+)
+_JOB_TITLES = (
+    'Data Engineer', 'Analytics Engineer', 'BI Developer',
+    'ETL Developer', 'Data Architect', 'Platform Engineer',
+    'Senior Data Engineer', 'Lead Data Engineer'
+)
+_DATA_ENGINEER_TITLES = (
+    'Senior Data Engineer', 'Lead Data Engineer', 'Principal Data Engineer'
+)
+_ANALYST_TITLES = ('Data Analyst', 'Business Analyst', 'BI Developer')
+_TIMEZONES = (
+    'UTC', 'Europe/Paris', 'America/New_York', 'Asia/Tokyo',
+    'Australia/Sydney', 'America/Los_Angeles'
+)
+_LANGUAGES = ('en', 'fr', 'es')
+_THEMES = ('light', 'dark', 'auto')
+_LAYOUTS = ('grid', 'list', 'cards')
+# Domaines email, user-agents et bios générés une seule fois à l'import
+_EMAIL_DOMAINS = tuple(fake.domain_name() for _ in range(5))
+_BIOS = tuple(fake.text(max_nb_chars=400) for _ in range(32))
+_USER_AGENTS = tuple(fake.user_agent() for _ in range(20))
+
+
+@lru_cache(maxsize=None)
+def default_password_hash():
+    """
+    Hash de DEFAULT_PASSWORD, calculé une seule fois par processus
+    (le hasheur par défaut, PBKDF2, coûte des centaines de ms par appel)
+    """
+    return make_password(DEFAULT_PASSWORD)
+
+
+def _hash_password(raw_password):
+    if raw_password == DEFAULT_PASSWORD:
+        return default_password_hash()
+    return make_password(raw_password)
+
+
+def _sequence_ip(n):
+    """Adresse IP privée (10.0.0.0/8) dérivée du numéro de séquence"""
+    return f'10.{(n >> 16) & 255}.{(n >> 8) & 255}.{n & 255}'
+
+
+def _build_preferences():
+    """Préférences utilisateur aléatoires"""
+    return {
+        'theme': rng.choice(_THEMES),
+        'dashboard_layout': rng.choice(_LAYOUTS),
+        'default_page_size': rng.randint(10, 100),
+        'auto_refresh_interval': rng.randint(30, 300),
+        'notifications_enabled': rng.random() < 0.5,
+    }
+
+
+class CustomUserFactory(BulkModelFactoryMixin,
+                        factory.django.DjangoModelFactory):
     """Factory pour CustomUser"""
     
     class Meta:
         model = User
         django_get_or_create = ('email',)
 
-    id = factory.Faker('uuid4')
-    email = factory.Sequence(lambda n: f'user{n}@{fake.domain_name()}')
+    email = factory.Sequence(
+        lambda n: f'user{n}@{_EMAIL_DOMAINS[n % len(_EMAIL_DOMAINS)]}'
+    )
     first_name = factory.Faker('first_name')
     last_name = factory.Faker('last_name')
+    # Hashé dès la construction : l'INSERT contient déjà le mot de passe
+    # (CustomUserFactory(password='...') pour un autre mot de passe)
+    password = factory.Transformer(DEFAULT_PASSWORD, transform=_hash_password)
     
     is_active = True
-    is_staff = factory.Faker('boolean', chance_of_getting_true=20)
+    is_staff = Bool(20)
     
     # Champs ETL spécifiques
-    department = factory.Faker('random_element', elements=(
-        'Data Engineering', 'Analytics', 'Business Intelligence', 
-        'IT Operations', 'Data Science', 'DevOps'
-    ))
-    job_title = factory.Faker('random_element', elements=(
-        'Data Engineer', 'Analytics Engineer', 'BI Developer',
-        'ETL Developer', 'Data Architect', 'Platform Engineer',
-        'Senior Data Engineer', 'Lead Data Engineer'
-    ))
-    phone = factory.Faker('phone_number')
+    department = factory.LazyFunction(lambda: rng.choice(_DEPARTMENTS))
+    job_title = factory.LazyFunction(lambda: rng.choice(_JOB_TITLES))
+    phone = factory.Sequence(lambda n: f'+33{600000000 + n:09d}')
     
     # Permissions ETL
-    can_create_pipelines = factory.Faker('boolean', chance_of_getting_true=60)
-    can_modify_pipelines = factory.Faker('boolean', chance_of_getting_true=40)
-    can_execute_pipelines = factory.Faker('boolean', chance_of_getting_true=90)
-    can_view_monitoring = factory.Faker('boolean', chance_of_getting_true=95)
-    can_manage_connectors = factory.Faker('boolean', chance_of_getting_true=30)
+    can_create_pipelines = Bool(60)
+    can_modify_pipelines = Bool(40)
+    can_execute_pipelines = Bool(90)
+    can_view_monitoring = Bool(95)
+    can_manage_connectors = Bool(30)
     
     # Préférences utilisateur
-    preferences = factory.LazyFunction(lambda: {
-        'theme': fake.random_element(['light', 'dark', 'auto']),
-        'dashboard_layout': fake.random_element(['grid', 'list', 'cards']),
-        'default_page_size': fake.random_int(10, 100),
-        'auto_refresh_interval': fake.random_int(30, 300),
-        'notifications_enabled': fake.boolean(),
-    })
+    preferences = factory.LazyFunction(_build_preferences)
     
-    last_login_ip = factory.Faker('ipv4')
-
-    @factory.post_generation
-    def set_password(self, create, extracted, **kwargs):
-        if not create:
-            return
-        password = extracted or 'testpass123'
-        self.set_password(password)
-        self.save()
+    last_login_ip = factory.Sequence(_sequence_ip)
+    
+    @classmethod
+    def _after_bulk_create(cls, objects):
+        # bulk_create n'envoie pas post_save : profils créés ici
+        UserProfile.objects.bulk_create(
+            [UserProfile(user=user) for user in objects],
+            batch_size=BULK_BATCH_SIZE
+        )
 
 
 class UserProfileFactory(factory.django.DjangoModelFactory):
@@ -75,16 +129,13 @@ class UserProfileFactory(factory.django.DjangoModelFactory):
 
     user = factory.SubFactory(CustomUserFactory)
     
-    timezone = factory.Faker('random_element', elements=(
-        'UTC', 'Europe/Paris', 'America/New_York', 'Asia/Tokyo',
-        'Australia/Sydney', 'America/Los_Angeles'
-    ))
-    language = factory.Faker('random_element', elements=('en', 'fr', 'es'))
+    timezone = factory.LazyFunction(lambda: rng.choice(_TIMEZONES))
+    language = factory.LazyFunction(lambda: rng.choice(_LANGUAGES))
     
-    email_notifications = factory.Faker('boolean', chance_of_getting_true=80)
-    pipeline_notifications = factory.Faker('boolean', chance_of_getting_true=75)
+    email_notifications = Bool(80)
+    pipeline_notifications = Bool(75)
     
-    bio = factory.Faker('text', max_nb_chars=400)
+    bio = factory.Iterator(_BIOS)
 
 
 class UserSessionFactory(factory.django.DjangoModelFactory):
@@ -94,10 +145,20 @@ class UserSessionFactory(factory.django.DjangoModelFactory):
         model = UserSession
 
     user = factory.SubFactory(CustomUserFactory)
-    session_key = factory.Faker('sha1')
-    ip_address = factory.Faker('ipv4')
-    user_agent = factory.Faker('user_agent')
-    is_active = factory.Faker('boolean', chance_of_getting_true=70)
+    session_key = factory.LazyFunction(lambda: secrets.token_hex(20))
+    ip_address = factory.Sequence(_sequence_ip)
+    user_agent = factory.LazyFunction(lambda: rng.choice(_USER_AGENTS))
+    is_active = Bool(70)
+
+
+class FastCustomUserFactory(CustomUserFactory):
+    """
+    CustomUser sans get_or_create : pas de SELECT avant l'INSERT, pour
+    les chemins de seed où l'email (Sequence) est déjà unique
+    """
+    
+    class Meta:
+        django_get_or_create = ()
 
 
 # Factory spécialisées pour différents types d'utilisateurs
@@ -117,9 +178,9 @@ class AdminUserFactory(CustomUserFactory):
 class DataEngineerFactory(CustomUserFactory):
     """Factory pour les data engineers"""
     department = 'Data Engineering'
-    job_title = factory.Faker('random_element', elements=(
-        'Senior Data Engineer', 'Lead Data Engineer', 'Principal Data Engineer'
-    ))
+    job_title = factory.LazyFunction(
+        lambda: rng.choice(_DATA_ENGINEER_TITLES)
+    )
     can_create_pipelines = True
     can_modify_pipelines = True
     can_execute_pipelines = True
@@ -130,9 +191,7 @@ class DataEngineerFactory(CustomUserFactory):
 class AnalystFactory(CustomUserFactory):
     """Factory pour les analystes"""
     department = 'Analytics'
-    job_title = factory.Faker('random_element', elements=(
-        'Data Analyst', 'Business Analyst', 'BI Developer'
-    ))
+    job_title = factory.LazyFunction(lambda: rng.choice(_ANALYST_TITLES))
     can_create_pipelines = False
     can_modify_pipelines = False
     can_execute_pipelines = True
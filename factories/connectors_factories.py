@@ -1,19 +1,126 @@
 """
 Factories pour les modèles de connecteurs
 """
+import secrets
+import uuid
 import factory
 import json
+from collections import defaultdict
+from datetime import timedelta
 from cryptography.fernet import Fernet
-from faker import Faker
+from django.db import transaction
+from django.utils import timezone
+from apps.core.models import Organization
 from apps.connectors.models import (
     Credential, Connector, DatabaseConnector, 
     APIConnector, FileConnector, CloudConnector,
     ConnectorType
 )
-from .core_factories import OrganizationFactory
-from .authentication_factories import CustomUserFactory
+from ._faker import fake
+from ._bulk import BULK_BATCH_SIZE, BulkModelFactoryMixin, pooled_subfactory
+from ._declarations import Bool, Int, rng
+from .core_factories import OrganizationFactory, FastOrganizationFactory
+from .authentication_factories import (
+    CustomUserFactory, FastCustomUserFactory, User,
+    _EMAIL_DOMAINS, _USER_AGENTS
+)
+
+
+# Valeurs tirées avec rng.choice (plus rapide que Faker random_element)
+_CONNECTOR_TYPES = (
+    ConnectorType.DATABASE,
+    ConnectorType.API,
+    ConnectorType.FILE,
+    ConnectorType.CLOUD,
+)
+_DB_TYPES = ('postgresql', 'mysql', 'sqlite', 'oracle', 'sqlserver')
+_AUTH_TYPES = ('none', 'basic', 'bearer', 'oauth2', 'api_key')
+_FILE_TYPES = ('csv', 'json', 'xml', 'excel', 'parquet')
+_ENCODINGS = ('utf-8', 'latin-1', 'ascii', 'utf-16')
+_QUOTE_CHARS = ('"', "'", '`')
+_PROVIDERS = ('aws_s3', 'azure_blob', 'gcp_storage', 'minio')
+_ENVIRONMENTS = ('dev', 'staging', 'prod')
+_TEAMS = ('data', 'analytics', 'engineering')
+_MAINTENANCE_DAYS = ('monday', 'tuesday', 'sunday')
+_API_VERSIONS = ('v1', 'v2', 'v3')
+_TAGS = (
+    'etl', 'data', 'prod', 'critical', 'raw',
+    'clean', 'curated', 'gold', 'silver', 'bronze'
+)
+
+# Descriptions générées une seule fois à l'import
+_DESCRIPTIONS = tuple(fake.text(max_nb_chars=200) for _ in range(32))
+
+# Tables de correspondance utilisées par les LazyAttribute
+_DB_PORTS = {
+    'postgresql': 5432,
+    'mysql': 3306,
+    'sqlite': 0,
+    'oracle': 1521,
+    'sqlserver': 1433,
+}
+_DELIMITERS = {
+    'csv': ',',
+    'tsv': '\t',
+    'pipe': '|',
+}
+_CLOUD_REGIONS = {
+    'aws_s3': ('us-east-1', 'eu-west-1', 'ap-southeast-1'),
+    'azure_blob': ('eastus', 'westeurope', 'southeastasia'),
+    'gcp_storage': ('us-central1', 'europe-west1', 'asia-east1'),
+    'minio': ('local',),
+}
+
+
+def _endpoint_url(provider):
+    """URL d'endpoint selon le provider (vide pour AWS/GCP)"""
+    if provider == 'minio':
+        return f'http://{fake.domain_name()}:9000'
+    if provider == 'azure_blob':
+        return f'https://{fake.word()}.blob.core.windows.net'
+    return ''
+
+
+# En-têtes communs à toutes les API
+_JSON_HEADERS = {
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+}
+
+
+def _build_connector_config():
+    """Configuration générique d'un connecteur"""
+    return {
+        'description': rng.choice(_DESCRIPTIONS),
+        'tags': rng.sample(_TAGS, k=rng.randint(1, 5)),
+        'environment': rng.choice(_ENVIRONMENTS),
+        'team': rng.choice(_TEAMS),
+        'contact_email': f'data-team@{rng.choice(_EMAIL_DOMAINS)}',
+        'documentation_url': (
+            f'https://docs.{rng.choice(_EMAIL_DOMAINS)}'
+            f'/connectors/{rng.randint(1, 9999)}'
+        ),
+        'maintenance_window': {
+            'day': rng.choice(_MAINTENANCE_DAYS),
+            'start_time': fake.time(),
+            'duration_hours': rng.randint(1, 4),
+        }
+    }
 
-fake = Faker('fr_FR')
+
+def _build_api_headers():
+    """En-têtes HTTP d'un connecteur API"""
+    return {
+        'User-Agent': rng.choice(_USER_AGENTS),
+        **_JSON_HEADERS,
+        'X-API-Version': rng.choice(_API_VERSIONS),
+        'X-Client-Id': str(uuid.uuid4()),
+    }
+
+
+# Clé de chiffrement unique pour les tests : les données ne sont jamais
+# déchiffrées, inutile de générer une clé par credential
+_TEST_FERNET = Fernet(Fernet.generate_key())
 
 
 class CredentialFactory(factory.django.DjangoModelFactory):
@@ -22,11 +129,16 @@ class CredentialFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = Credential
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     name = factory.Faker('word')
-    organization = factory.SubFactory(OrganizationFactory)
-    encryption_key_id = factory.Faker('uuid4')
-    expires_at = factory.Faker('future_datetime', end_date='+1y')
+    organization = pooled_subfactory(
+        OrganizationFactory,
+        Organization.objects.all()
+    )
+    encryption_key_id = factory.LazyFunction(uuid.uuid4)
+    expires_at = factory.LazyFunction(
+        lambda: timezone.now() + timedelta(days=rng.randint(1, 365))
+    )
     
     @factory.lazy_attribute
     def encrypted_data(self):
@@ -34,47 +146,33 @@ class CredentialFactory(factory.django.DjangoModelFactory):
         data = {
             'username': fake.user_name(),
             'password': fake.password(),
-            'api_key': fake.sha256(),
-            'token': fake.sha1(),
+            'api_key': secrets.token_hex(32),
+            'token': secrets.token_hex(20),
         }
-        # Pour les tests, on utilise une clé fixe
-        key = Fernet.generate_key()
-        fernet = Fernet(key)
-        return fernet.encrypt(json.dumps(data).encode()).decode()
+        return _TEST_FERNET.encrypt(json.dumps(data).encode()).decode()
 
 
-class ConnectorFactory(factory.django.DjangoModelFactory):
+class ConnectorFactory(BulkModelFactoryMixin,
+                       factory.django.DjangoModelFactory):
     """Factory pour Connector"""
     
     class Meta:
         model = Connector
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     name = factory.Faker('word')
-    connector_type = factory.Faker('random_element', elements=[
-        ConnectorType.DATABASE,
-        ConnectorType.API,
-        ConnectorType.FILE,
-        ConnectorType.CLOUD,
-    ])
-    organization = factory.SubFactory(OrganizationFactory)
-    created_by = factory.SubFactory(CustomUserFactory)
+    connector_type = factory.LazyFunction(
+        lambda: rng.choice(_CONNECTOR_TYPES)
+    )
+    organization = pooled_subfactory(
+        OrganizationFactory,
+        Organization.objects.all()
+    )
+    created_by = pooled_subfactory(CustomUserFactory, User.objects.all())
     credential = factory.SubFactory(CredentialFactory)
-    is_active = factory.Faker('boolean', chance_of_getting_true=85)
+    is_active = Bool(85)
     
-    config = factory.LazyFunction(lambda: {
-        'description': fake.text(max_nb_chars=200),
-        'tags': fake.words(nb=fake.random_int(1, 5)),
-        'environment': fake.random_element(['dev', 'staging', 'prod']),
-        'team': fake.random_element(['data', 'analytics', 'engineering']),
-        'contact_email': fake.email(),
-        'documentation_url': fake.url(),
-        'maintenance_window': {
-            'day': fake.random_element(['monday', 'tuesday', 'sunday']),
-            'start_time': fake.time(),
-            'duration_hours': fake.random_int(1, 4),
-        }
-    })
+    config = factory.LazyFunction(_build_connector_config)
 
 
 class DatabaseConnectorFactory(factory.django.DjangoModelFactory):
@@ -88,21 +186,15 @@ class DatabaseConnectorFactory(factory.django.DjangoModelFactory):
         connector_type=ConnectorType.DATABASE
     )
     
-    database_type = factory.Faker('random_element', elements=[
-        'postgresql', 'mysql', 'sqlite', 'oracle', 'sqlserver'
-    ])
+    database_type = factory.LazyFunction(lambda: rng.choice(_DB_TYPES))
     host = factory.Faker('domain_name')
-    port = factory.LazyAttribute(lambda obj: {
-        'postgresql': 5432,
-        'mysql': 3306,
-        'sqlite': 0,
-        'oracle': 1521,
-        'sqlserver': 1433,
-    }.get(obj.database_type, 5432))
+    port = factory.LazyAttribute(
+        lambda obj: _DB_PORTS.get(obj.database_type, 5432)
+    )
     database_name = factory.Faker('word')
     schema_name = factory.Faker('word')
-    ssl_enabled = factory.Faker('boolean', chance_of_getting_true=70)
-    connection_timeout = factory.Faker('random_int', min=10, max=120)
+    ssl_enabled = Bool(70)
+    connection_timeout = Int(10, 120)
 
 
 class APIConnectorFactory(factory.django.DjangoModelFactory):
@@ -117,20 +209,12 @@ class APIConnectorFactory(factory.django.DjangoModelFactory):
     )
     
     base_url = factory.Faker('url')
-    auth_type = factory.Faker('random_element', elements=[
-        'none', 'basic', 'bearer', 'oauth2', 'api_key'
-    ])
-    timeout = factory.Faker('random_int', min=10, max=300)
-    retry_count = factory.Faker('random_int', min=1, max=5)
-    rate_limit = factory.Faker('random_int', min=100, max=10000)
+    auth_type = factory.LazyFunction(lambda: rng.choice(_AUTH_TYPES))
+    timeout = Int(10, 300)
+    retry_count = Int(1, 5)
+    rate_limit = Int(100, 10000)
     
-    headers = factory.LazyFunction(lambda: {
-        'User-Agent': fake.user_agent(),
-        'Accept': 'application/json',
-        'Content-Type': 'application/json',
-        'X-API-Version': fake.random_element(['v1', 'v2', 'v3']),
-        'X-Client-Id': fake.uuid4(),
-    })
+    headers = factory.LazyFunction(_build_api_headers)
 
 
 class FileConnectorFactory(factory.django.DjangoModelFactory):
@@ -144,20 +228,16 @@ class FileConnectorFactory(factory.django.DjangoModelFactory):
         connector_type=ConnectorType.FILE
     )
     
-    file_type = factory.Faker('random_element', elements=[
-        'csv', 'json', 'xml', 'excel', 'parquet'
-    ])
-    file_path = factory.Faker('file_path', depth=3, extension='csv')
-    encoding = factory.Faker('random_element', elements=[
-        'utf-8', 'latin-1', 'ascii', 'utf-16'
-    ])
-    delimiter = factory.LazyAttribute(lambda obj: {
-        'csv': ',',
-        'tsv': '\t',
-        'pipe': '|',
-    }.get(obj.file_type, ','))
-    has_header = factory.Faker('boolean', chance_of_getting_true=80)
-    quote_char = factory.Faker('random_element', elements=['"', "'", '`'])
+    file_type = factory.LazyFunction(lambda: rng.choice(_FILE_TYPES))
+    file_path = factory.LazyFunction(
+        lambda: f'/data/{rng.randint(0, 9999)}/export.csv'
+    )
+    encoding = factory.LazyFunction(lambda: rng.choice(_ENCODINGS))
+    delimiter = factory.LazyAttribute(
+        lambda obj: _DELIMITERS.get(obj.file_type, ',')
+    )
+    has_header = Bool(80)
+    quote_char = factory.LazyFunction(lambda: rng.choice(_QUOTE_CHARS))
 
 
 class CloudConnectorFactory(factory.django.DjangoModelFactory):
@@ -171,22 +251,12 @@ class CloudConnectorFactory(factory.django.DjangoModelFactory):
         connector_type=ConnectorType.CLOUD
     )
     
-    provider = factory.Faker('random_element', elements=[
-        'aws_s3', 'azure_blob', 'gcp_storage', 'minio'
-    ])
+    provider = factory.LazyFunction(lambda: rng.choice(_PROVIDERS))
     bucket_name = factory.Faker('slug')
-    region = factory.LazyAttribute(lambda obj: {
-        'aws_s3': fake.random_element(['us-east-1', 'eu-west-1', 'ap-southeast-1']),
-        'azure_blob': fake.random_element(['eastus', 'westeurope', 'southeastasia']),
-        'gcp_storage': fake.random_element(['us-central1', 'europe-west1', 'asia-east1']),
-        'minio': 'local',
-    }.get(obj.provider, 'us-east-1'))
-    endpoint_url = factory.LazyAttribute(lambda obj: {
-        'minio': f'http://{fake.domain_name()}:9000',
-        'aws_s3': '',
-        'azure_blob': f'https://{fake.word()}.blob.core.windows.net',
-        'gcp_storage': '',
-    }.get(obj.provider, ''))
+    region = factory.LazyAttribute(
+        lambda obj: rng.choice(_CLOUD_REGIONS.get(obj.provider, ('us-east-1',)))
+    )
+    endpoint_url = factory.LazyAttribute(lambda obj: _endpoint_url(obj.provider))
 
 
 # Factories spécialisées pour des connecteurs réalistes
@@ -213,8 +283,7 @@ class RESTAPIConnectorFactory(APIConnectorFactory):
     )
     headers = factory.LazyFunction(lambda: {
         'User-Agent': 'ETL-Platform/1.0',
-        'Accept': 'application/json',
-        'Content-Type': 'application/json',
+        **_JSON_HEADERS,
     })
 
 
@@ -244,6 +313,22 @@ class AzureBlobConnectorFactory(CloudConnectorFactory):
 
 # Factory pour créer un ensemble complet de connecteurs
 
+# (nom, type, factory du détail) de chaque connecteur d'un ensemble complet
+_CONNECTOR_SET_SPECS = (
+    # Base de données
+    ('Production PostgreSQL', ConnectorType.DATABASE,
+     PostgreSQLConnectorFactory),
+    ('Analytics MySQL', ConnectorType.DATABASE, MySQLConnectorFactory),
+    # APIs
+    ('CRM API', ConnectorType.API, RESTAPIConnectorFactory),
+    ('Marketing Platform API', ConnectorType.API, RESTAPIConnectorFactory),
+    # Fichiers
+    ('Daily Reports CSV', ConnectorType.FILE, CSVFileConnectorFactory),
+    # Cloud
+    ('Data Lake S3', ConnectorType.CLOUD, S3ConnectorFactory),
+)
+
+
 class ConnectorSetFactory(factory.django.DjangoModelFactory):
     """Factory qui crée un ensemble de connecteurs pour une organisation"""
     
@@ -251,71 +336,58 @@ class ConnectorSetFactory(factory.django.DjangoModelFactory):
         model = Connector
 
     @classmethod
+    @transaction.atomic
     def create_complete_set(cls, organization=None, created_by=None):
-        """Crée un ensemble complet de connecteurs"""
+        """
+        Crée un ensemble complet de connecteurs, en une seule transaction
+        (organisation et créateur par défaut compris)
+        """
         if not organization:
-            organization = OrganizationFactory()
+            organization = FastOrganizationFactory()
+        return cls.create_complete_sets([organization], created_by)
+
+    @classmethod
+    @transaction.atomic
+    def create_complete_sets(cls, organizations, created_by=None):
+        """
+        Crée un ensemble complet de connecteurs pour chaque organisation,
+        avec un INSERT multi-lignes par table quel que soit leur nombre
+        """
         if not created_by:
-            created_by = CustomUserFactory()
-        
-        connectors = []
-        
-        # Base de données
-        pg_connector = ConnectorFactory(
-            name='Production PostgreSQL',
-            connector_type=ConnectorType.DATABASE,
-            organization=organization,
-            created_by=created_by
-        )
-        PostgreSQLConnectorFactory(connector=pg_connector)
-        connectors.append(pg_connector)
-        
-        mysql_connector = ConnectorFactory(
-            name='Analytics MySQL',
-            connector_type=ConnectorType.DATABASE,
-            organization=organization,
-            created_by=created_by
-        )
-        MySQLConnectorFactory(connector=mysql_connector)
-        connectors.append(mysql_connector)
+            created_by = FastCustomUserFactory()
         
-        # APIs
-        crm_connector = ConnectorFactory(
-            name='CRM API',
-            connector_type=ConnectorType.API,
-            organization=organization,
-            created_by=created_by
-        )
-        RESTAPIConnectorFactory(connector=crm_connector)
-        connectors.append(crm_connector)
+        rows = [
+            (organization, spec)
+            for organization in organizations
+            for spec in _CONNECTOR_SET_SPECS
+        ]
         
-        marketing_connector = ConnectorFactory(
-            name='Marketing Platform API',
-            connector_type=ConnectorType.API,
-            organization=organization,
-            created_by=created_by
-        )
-        RESTAPIConnectorFactory(connector=marketing_connector)
-        connectors.append(marketing_connector)
+        # Objets construits en mémoire (build), puis un INSERT multi-lignes
+        # par table : credentials, connecteurs, puis un par modèle de détail
+        credentials = Credential.objects.bulk_create([
+            CredentialFactory.build(organization=organization)
+            for organization, _ in rows
+        ], batch_size=BULK_BATCH_SIZE)
         
-        # Fichiers
-        csv_connector = ConnectorFactory(
-            name='Daily Reports CSV',
-            connector_type=ConnectorType.FILE,
-            organization=organization,
-            created_by=created_by
-        )
-        CSVFileConnectorFactory(connector=csv_connector)
-        connectors.append(csv_connector)
+        connectors = Connector.objects.bulk_create([
+            ConnectorFactory.build(
+                name=name,
+                connector_type=connector_type,
+                organization=organization,
+                created_by=created_by,
+                credential=credential
+            )
+            for (organization, (name, connector_type, _)), credential
+            in zip(rows, credentials)
+        ], batch_size=BULK_BATCH_SIZE)
         
-        # Cloud
-        s3_connector = ConnectorFactory(
-            name='Data Lake S3',
-            connector_type=ConnectorType.CLOUD,
-            organization=organization,
-            created_by=created_by
-        )
-        S3ConnectorFactory(connector=s3_connector)
-        connectors.append(s3_connector)
+        # Un bulk_create par table de détail (DatabaseConnector, ...)
+        details = defaultdict(list)
+        for (_, (_, _, detail_factory)), connector in zip(rows, connectors):
+            details[detail_factory._meta.model].append(
+                detail_factory.build(connector=connector)
+            )
+        for model, objects in details.items():
+            model.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE)
         
         return connectors
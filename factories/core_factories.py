@@ -1,88 +1,105 @@
 """
 Factories pour les modèles core
 """
+import uuid
 import factory
-from faker import Faker
+from django.db import transaction
 from apps.core.models import Organization, OrganizationMembership
-from .authentication_factories import CustomUserFactory
+from ._faker import fake
+from ._bulk import BULK_BATCH_SIZE, BulkModelFactoryMixin, pooled_subfactory
+from ._declarations import Bool, rng
+from .authentication_factories import CustomUserFactory, User
 
-fake = Faker('fr_FR')
 
+# Valeurs tirées avec rng.choice (plus rapide que Faker random_element)
+_STARTUP_NAMES = (
+    'DataFlow Startup', 'Analytics Pro', 'InnoData Solutions',
+    'SmartPipe Technologies', 'DataStream Inc', 'FlowTech Startup'
+)
+_ENTERPRISE_NAMES = (
+    'Global Data Corp', 'Enterprise Analytics Ltd', 'MegaData Solutions',
+    'International Pipeline Co', 'DataVault Enterprise', 'StreamFlow Corp'
+)
+_ROLES = (
+    OrganizationMembership.Role.VIEWER,
+    OrganizationMembership.Role.DEVELOPER,
+    OrganizationMembership.Role.ADMIN,
+    OrganizationMembership.Role.OWNER,
+)
+_TIMEZONES = ('UTC', 'Europe/Paris', 'America/New_York')
+_ALLOWED_FILE_TYPES = ('csv', 'json', 'xml', 'parquet', 'xlsx')
 
-class OrganizationFactory(factory.django.DjangoModelFactory):
+
+def _build_organization_settings():
+    """Paramètres aléatoires d'une organisation"""
+    return {
+        'max_pipelines': rng.randint(10, 1000),
+        'max_connectors': rng.randint(5, 100),
+        'max_users': rng.randint(5, 500),
+        'retention_days': rng.randint(30, 365),
+        'allowed_file_types': rng.sample(
+            _ALLOWED_FILE_TYPES,
+            k=rng.randint(2, 5)
+        ),
+        'timezone': rng.choice(_TIMEZONES),
+        'notification_settings': {
+            'email_enabled': rng.random() < 0.5,
+            'slack_enabled': rng.random() < 0.5,
+            'webhook_enabled': rng.random() < 0.5,
+        },
+        'security_settings': {
+            'password_expiry_days': rng.randint(90, 365),
+            'max_login_attempts': rng.randint(3, 10),
+            'session_timeout_minutes': rng.randint(30, 480),
+        },
+        'feature_flags': {
+            'advanced_monitoring': rng.random() < 0.5,
+            'data_lineage': rng.random() < 0.5,
+            'custom_transforms': rng.random() < 0.5,
+            'api_access': rng.random() < 0.5,
+        }
+    }
+
+
+class OrganizationFactory(BulkModelFactoryMixin,
+                          factory.django.DjangoModelFactory):
     """Factory pour Organization"""
     
     class Meta:
         model = Organization
         django_get_or_create = ('slug',)
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     name = factory.Faker('company')
     slug = factory.LazyAttribute(lambda obj: fake.slug())
     
-    settings = factory.LazyFunction(lambda: {
-        'max_pipelines': fake.random_int(10, 1000),
-        'max_connectors': fake.random_int(5, 100),
-        'max_users': fake.random_int(5, 500),
-        'retention_days': fake.random_int(30, 365),
-        'allowed_file_types': fake.random_elements(
-            ['csv', 'json', 'xml', 'parquet', 'xlsx'], 
-            length=fake.random_int(2, 5)
-        ),
-        'timezone': fake.random_element([
-            'UTC', 'Europe/Paris', 'America/New_York'
-        ]),
-        'notification_settings': {
-            'email_enabled': fake.boolean(),
-            'slack_enabled': fake.boolean(),
-            'webhook_enabled': fake.boolean(),
-        },
-        'security_settings': {
-            'password_expiry_days': fake.random_int(90, 365),
-            'max_login_attempts': fake.random_int(3, 10),
-            'session_timeout_minutes': fake.random_int(30, 480),
-        },
-        'feature_flags': {
-            'advanced_monitoring': fake.boolean(),
-            'data_lineage': fake.boolean(),
-            'custom_transforms': fake.boolean(),
-            'api_access': fake.boolean(),
-        }
-    })
+    settings = factory.LazyFunction(_build_organization_settings)
 
 
-class OrganizationMembershipFactory(factory.django.DjangoModelFactory):
+class OrganizationMembershipFactory(BulkModelFactoryMixin,
+                                    factory.django.DjangoModelFactory):
     """Factory pour OrganizationMembership"""
     
     class Meta:
         model = OrganizationMembership
         django_get_or_create = ('user', 'organization')
 
-    id = factory.Faker('uuid4')
-    user = factory.SubFactory(CustomUserFactory)
-    organization = factory.SubFactory(OrganizationFactory)
-    role = factory.Faker('random_element', elements=[
-        OrganizationMembership.Role.VIEWER,
-        OrganizationMembership.Role.DEVELOPER,
-        OrganizationMembership.Role.ADMIN,
-        OrganizationMembership.Role.OWNER,
-    ])
-    is_active = factory.Faker('boolean', chance_of_getting_true=90)
-
+    id = factory.LazyFunction(uuid.uuid4)
+    user = pooled_subfactory(CustomUserFactory, User.objects.all())
+    organization = pooled_subfactory(
+        OrganizationFactory,
+        Organization.objects.all()
+    )
+    role = factory.LazyFunction(lambda: rng.choice(_ROLES))
+    is_active = Bool(90)
 
-# Factories spécialisées pour différents types d'organisations
 
-class StartupOrganizationFactory(OrganizationFactory):
-    """Factory pour une startup/petite organisation"""
-    name = factory.Faker('random_element', elements=[
-        'DataFlow Startup', 'Analytics Pro', 'InnoData Solutions',
-        'SmartPipe Technologies', 'DataStream Inc', 'FlowTech Startup'
-    ])
-    
-    settings = factory.LazyFunction(lambda: {
-        'max_pipelines': fake.random_int(5, 50),
-        'max_connectors': fake.random_int(3, 20),
-        'max_users': fake.random_int(2, 25),
+def _startup_settings():
+    """Paramètres d'une startup : seuls les quotas varient"""
+    return {
+        'max_pipelines': rng.randint(5, 50),
+        'max_connectors': rng.randint(3, 20),
+        'max_users': rng.randint(2, 25),
         'retention_days': 90,
         'allowed_file_types': ['csv', 'json', 'xlsx'],
         'timezone': 'Europe/Paris',
@@ -97,20 +114,15 @@ class StartupOrganizationFactory(OrganizationFactory):
             'custom_transforms': False,
             'api_access': True,
         }
-    })
+    }
 
 
-class EnterpriseOrganizationFactory(OrganizationFactory):
-    """Factory pour une grande entreprise"""
-    name = factory.Faker('random_element', elements=[
-        'Global Data Corp', 'Enterprise Analytics Ltd', 'MegaData Solutions',
-        'International Pipeline Co', 'DataVault Enterprise', 'StreamFlow Corp'
-    ])
-    
-    settings = factory.LazyFunction(lambda: {
-        'max_pipelines': fake.random_int(500, 2000),
-        'max_connectors': fake.random_int(50, 200),
-        'max_users': fake.random_int(100, 1000),
+def _enterprise_settings():
+    """Paramètres d'une grande entreprise : seuls les quotas varient"""
+    return {
+        'max_pipelines': rng.randint(500, 2000),
+        'max_connectors': rng.randint(50, 200),
+        'max_users': rng.randint(100, 1000),
         'retention_days': 365,
         'allowed_file_types': ['csv', 'json', 'xml', 'parquet', 'xlsx', 'avro'],
         'timezone': 'UTC',
@@ -130,7 +142,40 @@ class EnterpriseOrganizationFactory(OrganizationFactory):
             'custom_transforms': True,
             'api_access': True,
         }
-    })
+    }
+
+
+# Variantes sans get_or_create : pas de SELECT avant l'INSERT, pour les
+# chemins de seed où l'unicité est déjà garantie par l'appelant
+
+class FastOrganizationFactory(OrganizationFactory):
+    """Organization sans get_or_create sur le slug"""
+    
+    class Meta:
+        django_get_or_create = ()
+
+
+class FastOrganizationMembershipFactory(OrganizationMembershipFactory):
+    """OrganizationMembership sans get_or_create sur (user, organization)"""
+    
+    class Meta:
+        django_get_or_create = ()
+
+
+# Factories spécialisées pour différents types d'organisations
+
+class StartupOrganizationFactory(OrganizationFactory):
+    """Factory pour une startup/petite organisation"""
+    name = factory.LazyFunction(lambda: rng.choice(_STARTUP_NAMES))
+    
+    settings = factory.LazyFunction(_startup_settings)
+
+
+class EnterpriseOrganizationFactory(OrganizationFactory):
+    """Factory pour une grande entreprise"""
+    name = factory.LazyFunction(lambda: rng.choice(_ENTERPRISE_NAMES))
+    
+    settings = factory.LazyFunction(_enterprise_settings)
 
 
 # Factories pour créer des organisations avec des équipes complètes
@@ -148,37 +193,34 @@ class OrganizationWithTeamFactory(OrganizationFactory):
             AnalystFactory, ViewerFactory
         )
         
-        # Créer un admin/owner
-        admin = AdminUserFactory()
-        OrganizationMembershipFactory(
-            user=admin,
-            organization=self,
-            role=OrganizationMembership.Role.OWNER
-        )
-        
-        # Créer des data engineers
-        for _ in range(fake.random_int(2, 5)):
-            engineer = DataEngineerFactory()
-            OrganizationMembershipFactory(
-                user=engineer,
-                organization=self,
-                role=OrganizationMembership.Role.DEVELOPER
-            )
+        # (factory, rôle, nombre de membres)
+        team = [
+            # Un admin/owner
+            (AdminUserFactory, OrganizationMembership.Role.OWNER, 1),
+            (DataEngineerFactory, OrganizationMembership.Role.DEVELOPER,
+             fake.random_int(2, 5)),
+            (AnalystFactory, OrganizationMembership.Role.VIEWER,
+             fake.random_int(3, 8)),
+            (ViewerFactory, OrganizationMembership.Role.VIEWER,
+             fake.random_int(1, 3)),
+        ]
         
-        # Créer des analystes
-        for _ in range(fake.random_int(3, 8)):
-            analyst = AnalystFactory()
-            OrganizationMembershipFactory(
-                user=analyst,
-                organization=self,
-                role=OrganizationMembership.Role.VIEWER
-            )
+        # Objets construits en mémoire (build), puis un INSERT multi-lignes
+        # par table au lieu d'un INSERT par membre
+        users = []
+        roles = []
+        for user_factory, role, count in team:
+            users.extend(user_factory.build_batch(count))
+            roles.extend([role] * count)
         
-        # Créer quelques viewers
-        for _ in range(fake.random_int(1, 3)):
-            viewer = ViewerFactory()
-            OrganizationMembershipFactory(
-                user=viewer,
-                organization=self,
-                role=OrganizationMembership.Role.VIEWER
-            )
+        with transaction.atomic():
+            User.objects.bulk_create(users, batch_size=BULK_BATCH_SIZE)
+            CustomUserFactory._after_bulk_create(users)
+            OrganizationMembership.objects.bulk_create([
+                OrganizationMembershipFactory.build(
+                    user=user,
+                    organization=self,
+                    role=role
+                )
+                for user, role in zip(users, roles)
+            ], batch_size=BULK_BATCH_SIZE)
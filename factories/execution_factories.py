@@ -1,19 +1,113 @@
 """
 Factories pour les modèles d'exécution
 """
+import secrets
+import time
+import uuid
+from functools import lru_cache
 import factory
+from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
-from faker import Faker
+from datetime import datetime, timedelta
 from apps.execution.models import (
     PipelineRun, TaskRun, ExecutionQueue, ExecutionLock, DataLineage,
     RunStatus, TriggerType
 )
+from ._faker import fake
+from ._bulk import BULK_BATCH_SIZE
+from ._declarations import rng
 from .pipelines_factories import PipelineFactory, PipelineStepFactory
 from .tasks_factories import TaskFactory
 from .authentication_factories import CustomUserFactory
 
-fake = Faker('fr_FR')
+# Valeurs tirées avec rng.choice (plus rapide que Faker random_element)
+_RUN_STATUSES = (
+    RunStatus.PENDING,
+    RunStatus.RUNNING,
+    RunStatus.SUCCESS,
+    RunStatus.FAILED,
+    RunStatus.CANCELLED,
+    RunStatus.TIMEOUT,
+    RunStatus.SKIPPED,
+)
+_TASK_RUN_STATUSES = (
+    RunStatus.PENDING,
+    RunStatus.RUNNING,
+    RunStatus.SUCCESS,
+    RunStatus.FAILED,
+    RunStatus.CANCELLED,
+    RunStatus.SKIPPED,
+)
+_TRIGGER_TYPES = (
+    TriggerType.MANUAL,
+    TriggerType.SCHEDULED,
+    TriggerType.API,
+    TriggerType.WEBHOOK,
+    TriggerType.DEPENDENCY,
+)
+_QUEUE_PRIORITIES = (1, 2, 3, 4, 5)  # 1=LOW, 5=CRITICAL
+_LINEAGE_RELATIONSHIPS = ('direct', 'transformation', 'aggregation', 'join')
+_ENVIRONMENTS = ('dev', 'staging', 'prod')
+_EXECUTORS = ('local', 'docker', 'kubernetes')
+_VERSIONS = ('1.0.0', '1.1.0', '2.0.0')
+_PROCESSING_MODES = ('full', 'incremental')
+_TASK_OUTCOMES_AFTER_FAILURE = (
+    RunStatus.SUCCESS, RunStatus.FAILED, RunStatus.SKIPPED
+)
+_PIPELINE_ERRORS = (
+    "Connection timeout to database",
+    "Invalid data format in source file",
+    "Memory limit exceeded during processing",
+    "Authentication failed for external API",
+    "Data quality validation failed",
+    "Target table not found",
+    "Insufficient disk space",
+    "Network connectivity issue",
+)
+_TASK_ERRORS = (
+    "SQL syntax error in query",
+    "File not found at specified path",
+    "API rate limit exceeded",
+    "Data type conversion error",
+    "Validation rule violation",
+    "Connection lost during execution",
+    "Permission denied on target table",
+    "Resource allocation timeout",
+)
+
+# Plage des horodatages de logs (secondes depuis _LOG_EPOCH)
+_LOG_EPOCH = datetime(2020, 1, 1)
+_LOG_SPAN_SECONDS = 5 * 365 * 24 * 3600
+
+
+@lru_cache(maxsize=1)
+def _now_at(second):
+    # Recalculé au plus une fois par seconde (clé : seconde courante)
+    return timezone.now()
+
+
+def _batch_now():
+    """timezone.now() partagé par toutes les lignes d'une même seconde"""
+    return _now_at(int(time.time()))
+
+
+@lru_cache(maxsize=1)
+def _log_date_path(minute):
+    # Recalculé au plus une fois par minute (clé : minute courante)
+    return timezone.now().strftime('%Y/%m/%d')
+
+
+def _run_log_date(run):
+    """Date du chemin de log : celle de started_at s'il est fourni"""
+    started_at = getattr(run, 'started_at', None)
+    if started_at is not None:
+        return started_at.strftime('%Y/%m/%d')
+    return _log_date_path(int(time.time()) // 60)
+
+
+def _fast_dt():
+    """Horodatage aléatoire pour les logs, sans passer par Faker"""
+    return _LOG_EPOCH + timedelta(seconds=rng.randint(0, _LOG_SPAN_SECONDS))
 
 
 class PipelineRunFactory(factory.django.DjangoModelFactory):
@@ -22,45 +116,30 @@ class PipelineRunFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = PipelineRun
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     pipeline = factory.SubFactory(PipelineFactory)
     triggered_by = factory.SubFactory(CustomUserFactory)
-    status = factory.Faker('random_element', elements=[
-        RunStatus.PENDING,
-        RunStatus.RUNNING,
-        RunStatus.SUCCESS,
-        RunStatus.FAILED,
-        RunStatus.CANCELLED,
-        RunStatus.TIMEOUT,
-        RunStatus.SKIPPED,
-    ])
-    trigger_type = factory.Faker('random_element', elements=[
-        TriggerType.MANUAL,
-        TriggerType.SCHEDULED,
-        TriggerType.API,
-        TriggerType.WEBHOOK,
-        TriggerType.DEPENDENCY,
-    ])
+    status = factory.LazyFunction(lambda: rng.choice(_RUN_STATUSES))
+    trigger_type = factory.LazyFunction(lambda: rng.choice(_TRIGGER_TYPES))
     
     @factory.lazy_attribute
     def completed_at(self):
         if self.status in [RunStatus.SUCCESS, RunStatus.FAILED, RunStatus.CANCELLED, RunStatus.TIMEOUT]:
-            # Use timezone.now() as base time since started_at is auto-generated
-            base_time = timezone.now()
-            return base_time + timedelta(
-                minutes=fake.random_int(1, 120),
-                seconds=fake.random_int(0, 59)
-            )
+            # started_at is auto-generated unless passed in (e.g. by
+            # create_pipeline_history); fall back to the batch "now"
+            base_time = getattr(self, 'started_at', None) or _batch_now()
+            # 1 min à 2 h 59 s
+            return base_time + timedelta(seconds=rng.randint(60, 7259))
         return None
     
     context = factory.LazyFunction(lambda: {
-        'execution_id': fake.uuid4(),
-        'environment': fake.random_element(['dev', 'staging', 'prod']),
-        'executor': fake.random_element(['local', 'docker', 'kubernetes']),
-        'version': fake.random_element(['1.0.0', '1.1.0', '2.0.0']),
+        'execution_id': str(uuid.uuid4()),
+        'environment': rng.choice(_ENVIRONMENTS),
+        'executor': rng.choice(_EXECUTORS),
+        'version': rng.choice(_VERSIONS),
         'parameters': {
             'batch_date': fake.date_object().isoformat(),
-            'processing_mode': fake.random_element(['full', 'incremental']),
+            'processing_mode': rng.choice(_PROCESSING_MODES),
             'debug_enabled': fake.boolean(),
         },
         'resources': {
@@ -69,9 +148,9 @@ class PipelineRunFactory(factory.django.DjangoModelFactory):
             'worker_nodes': fake.random_int(1, 5),
         },
         'external_refs': {
-            'job_id': fake.uuid4(),
-            'cluster_id': fake.uuid4(),
-            'session_id': fake.uuid4(),
+            'job_id': str(uuid.uuid4()),
+            'cluster_id': str(uuid.uuid4()),
+            'session_id': str(uuid.uuid4()),
         }
     })
     
@@ -80,50 +159,49 @@ class PipelineRunFactory(factory.django.DjangoModelFactory):
     @factory.lazy_attribute
     def error_message(self):
         if self.status == RunStatus.FAILED:
-            return fake.random_element([
-                "Connection timeout to database",
-                "Invalid data format in source file",
-                "Memory limit exceeded during processing",
-                "Authentication failed for external API",
-                "Data quality validation failed",
-                "Target table not found",
-                "Insufficient disk space",
-                "Network connectivity issue"
-            ])
+            return rng.choice(_PIPELINE_ERRORS)
         return ""
     
     log_file_path = factory.LazyAttribute(
-        lambda obj: f"/logs/pipelines/{obj.pipeline.name}/{timezone.now().strftime('%Y/%m/%d')}/{obj.id}.log"
+        lambda obj: f"/logs/pipelines/{obj.pipeline.name}/{_run_log_date(obj)}/{obj.id}.log"
     )
 
 
 def _generate_pipeline_metrics(status):
     """Génère des métriques réalistes selon le statut"""
-    base_metrics = {
-        'execution_time_seconds': fake.random_int(60, 7200),
-        'memory_usage_mb': fake.random_int(256, 4096),
-        'cpu_usage_percent': fake.random_int(10, 95),
-        'network_io_mb': fake.random_int(10, 1000),
-        'disk_io_mb': fake.random_int(100, 5000),
-    }
-    
+    # Un littéral complet par statut (pas de dict de base + update)
     if status == RunStatus.SUCCESS:
-        base_metrics.update({
-            'records_processed': fake.random_int(1000, 1000000),
-            'records_inserted': fake.random_int(500, 500000),
-            'records_updated': fake.random_int(100, 100000),
-            'records_skipped': fake.random_int(0, 10000),
-            'data_quality_score': fake.random.uniform(0.85, 1.0),
-            'throughput_records_per_second': fake.random_int(100, 10000),
-        })
-    elif status == RunStatus.FAILED:
-        base_metrics.update({
-            'records_processed': fake.random_int(0, 50000),
-            'error_count': fake.random_int(1, 100),
-            'last_successful_step': fake.random_int(0, 5),
-        })
-    
-    return base_metrics
+        return {
+            'execution_time_seconds': rng.randint(60, 7200),
+            'memory_usage_mb': rng.randint(256, 4096),
+            'cpu_usage_percent': rng.randint(10, 95),
+            'network_io_mb': rng.randint(10, 1000),
+            'disk_io_mb': rng.randint(100, 5000),
+            'records_processed': rng.randint(1000, 1000000),
+            'records_inserted': rng.randint(500, 500000),
+            'records_updated': rng.randint(100, 100000),
+            'records_skipped': rng.randint(0, 10000),
+            'data_quality_score': rng.uniform(0.85, 1.0),
+            'throughput_records_per_second': rng.randint(100, 10000),
+        }
+    if status == RunStatus.FAILED:
+        return {
+            'execution_time_seconds': rng.randint(60, 7200),
+            'memory_usage_mb': rng.randint(256, 4096),
+            'cpu_usage_percent': rng.randint(10, 95),
+            'network_io_mb': rng.randint(10, 1000),
+            'disk_io_mb': rng.randint(100, 5000),
+            'records_processed': rng.randint(0, 50000),
+            'error_count': rng.randint(1, 100),
+            'last_successful_step': rng.randint(0, 5),
+        }
+    return {
+        'execution_time_seconds': rng.randint(60, 7200),
+        'memory_usage_mb': rng.randint(256, 4096),
+        'cpu_usage_percent': rng.randint(10, 95),
+        'network_io_mb': rng.randint(10, 1000),
+        'disk_io_mb': rng.randint(100, 5000),
+    }
 
 
 class TaskRunFactory(factory.django.DjangoModelFactory):
@@ -132,37 +210,28 @@ class TaskRunFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = TaskRun
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     pipeline_run = factory.SubFactory(PipelineRunFactory)
     pipeline_step = factory.SubFactory(PipelineStepFactory)
     task = factory.SubFactory(TaskFactory)
-    status = factory.Faker('random_element', elements=[
-        RunStatus.PENDING,
-        RunStatus.RUNNING,
-        RunStatus.SUCCESS,
-        RunStatus.FAILED,
-        RunStatus.CANCELLED,
-        RunStatus.SKIPPED,
-    ])
+    status = factory.LazyFunction(lambda: rng.choice(_TASK_RUN_STATUSES))
     retry_count = factory.Faker('random_int', min=0, max=3)
-    worker_id = factory.Faker('uuid4')
+    worker_id = factory.LazyFunction(lambda: str(uuid.uuid4()))
     
     @factory.lazy_attribute
     def started_at(self):
         if self.status != RunStatus.PENDING:
-            # Use current time as base since pipeline_run.started_at is auto-generated
-            base_time = timezone.now()
-            return base_time + timedelta(
-                minutes=fake.random_int(0, 30)
-            )
+            # Use the batch "now" as base since pipeline_run.started_at is auto-generated
+            base_time = _batch_now()
+            return base_time + timedelta(seconds=rng.randint(0, 1800))
         return None
     
     @factory.lazy_attribute
     def completed_at(self):
         if self.status in [RunStatus.SUCCESS, RunStatus.FAILED, RunStatus.CANCELLED, RunStatus.SKIPPED]:
+            # 1 min à 1 h 59 s
             return self.started_at + timedelta(
-                minutes=fake.random_int(1, 60),
-                seconds=fake.random_int(0, 59)
+                seconds=rng.randint(60, 3659)
             ) if self.started_at else None
         return None
     
@@ -188,16 +257,7 @@ class TaskRunFactory(factory.django.DjangoModelFactory):
     @factory.lazy_attribute
     def error_message(self):
         if self.status == RunStatus.FAILED:
-            return fake.random_element([
-                "SQL syntax error in query",
-                "File not found at specified path",
-                "API rate limit exceeded",
-                "Data type conversion error",
-                "Validation rule violation",
-                "Connection lost during execution",
-                "Permission denied on target table",
-                "Resource allocation timeout"
-            ])
+            return rng.choice(_TASK_ERRORS)
         return ""
 
 
@@ -205,16 +265,16 @@ def _generate_task_output(status):
     """Génère des données de sortie selon le statut"""
     if status == RunStatus.SUCCESS:
         return {
-            'output_records': fake.random_int(500, 50000),
-            'output_size_mb': fake.random_int(5, 500),
+            'output_records': rng.randint(500, 50000),
+            'output_size_mb': rng.randint(5, 500),
             'output_path': fake.file_path(depth=3),
-            'checksum': fake.sha256(),
-            'schema_changes': fake.boolean(),
+            'checksum': secrets.token_hex(32),
+            'schema_changes': rng.random() < 0.5,
         }
     elif status == RunStatus.FAILED:
         return {
-            'partial_output_records': fake.random_int(0, 1000),
-            'error_records': fake.random_int(1, 100),
+            'partial_output_records': rng.randint(0, 1000),
+            'error_records': rng.randint(1, 100),
         }
     return None
 
@@ -222,21 +282,21 @@ def _generate_task_output(status):
 def _generate_task_logs(status):
     """Génère des logs réalistes selon le statut"""
     base_logs = [
-        f"[{fake.date_time()}] INFO: Task started",
-        f"[{fake.date_time()}] INFO: Initializing connections",
-        f"[{fake.date_time()}] INFO: Processing data batch 1",
+        f"[{_fast_dt()}] INFO: Task started",
+        f"[{_fast_dt()}] INFO: Initializing connections",
+        f"[{_fast_dt()}] INFO: Processing data batch 1",
     ]
     
     if status == RunStatus.SUCCESS:
         base_logs.extend([
-            f"[{fake.date_time()}] INFO: Processing completed successfully",
-            f"[{fake.date_time()}] INFO: Records processed: {fake.random_int(1000, 100000)}",
-            f"[{fake.date_time()}] INFO: Task completed",
+            f"[{_fast_dt()}] INFO: Processing completed successfully",
+            f"[{_fast_dt()}] INFO: Records processed: {rng.randint(1000, 100000)}",
+            f"[{_fast_dt()}] INFO: Task completed",
         ])
     elif status == RunStatus.FAILED:
         base_logs.extend([
-            f"[{fake.date_time()}] ERROR: {fake.sentence()}",
-            f"[{fake.date_time()}] ERROR: Task failed with errors",
+            f"[{_fast_dt()}] ERROR: {fake.sentence()}",
+            f"[{_fast_dt()}] ERROR: Task failed with errors",
         ])
     
     return "\n".join(base_logs)
@@ -244,27 +304,35 @@ def _generate_task_logs(status):
 
 def _generate_task_metrics(status):
     """Génère des métriques de tâche selon le statut"""
-    base_metrics = {
-        'execution_time_seconds': fake.random_int(10, 1800),
-        'memory_peak_mb': fake.random_int(128, 2048),
-        'cpu_avg_percent': fake.random_int(20, 90),
-        'io_read_mb': fake.random_int(10, 500),
-        'io_write_mb': fake.random_int(5, 250),
-    }
-    
+    # Un littéral complet par statut (pas de dict de base + update)
     if status == RunStatus.SUCCESS:
-        base_metrics.update({
-            'records_per_second': fake.random_int(50, 5000),
+        return {
+            'execution_time_seconds': rng.randint(10, 1800),
+            'memory_peak_mb': rng.randint(128, 2048),
+            'cpu_avg_percent': rng.randint(20, 90),
+            'io_read_mb': rng.randint(10, 500),
+            'io_write_mb': rng.randint(5, 250),
+            'records_per_second': rng.randint(50, 5000),
             'success_rate': 1.0,
-            'data_quality_score': fake.random.uniform(0.8, 1.0),
-        })
-    elif status == RunStatus.FAILED:
-        base_metrics.update({
+            'data_quality_score': rng.uniform(0.8, 1.0),
+        }
+    if status == RunStatus.FAILED:
+        return {
+            'execution_time_seconds': rng.randint(10, 1800),
+            'memory_peak_mb': rng.randint(128, 2048),
+            'cpu_avg_percent': rng.randint(20, 90),
+            'io_read_mb': rng.randint(10, 500),
+            'io_write_mb': rng.randint(5, 250),
             'success_rate': 0.0,
-            'error_rate': fake.random.uniform(0.1, 1.0),
-        })
-    
-    return base_metrics
+            'error_rate': rng.uniform(0.1, 1.0),
+        }
+    return {
+        'execution_time_seconds': rng.randint(10, 1800),
+        'memory_peak_mb': rng.randint(128, 2048),
+        'cpu_avg_percent': rng.randint(20, 90),
+        'io_read_mb': rng.randint(10, 500),
+        'io_write_mb': rng.randint(5, 250),
+    }
 
 
 class ExecutionQueueFactory(factory.django.DjangoModelFactory):
@@ -273,9 +341,9 @@ class ExecutionQueueFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = ExecutionQueue
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     pipeline_run = factory.SubFactory(PipelineRunFactory, status=RunStatus.PENDING)
-    priority = factory.Faker('random_element', elements=[1, 2, 3, 4, 5])  # 1=LOW, 5=CRITICAL
+    priority = factory.LazyFunction(lambda: rng.choice(_QUEUE_PRIORITIES))
     scheduled_at = factory.Faker('future_datetime', end_date='+1h')
 
 
@@ -285,7 +353,7 @@ class ExecutionLockFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = ExecutionLock
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     pipeline = factory.SubFactory(PipelineFactory)
     locked_by = factory.SubFactory(PipelineRunFactory, status=RunStatus.RUNNING)
     expires_at = factory.Faker('future_datetime', end_date='+2h')
@@ -297,12 +365,12 @@ class DataLineageFactory(factory.django.DjangoModelFactory):
     class Meta:
         model = DataLineage
 
-    id = factory.Faker('uuid4')
+    id = factory.LazyFunction(uuid.uuid4)
     source_task = factory.SubFactory(TaskRunFactory)
     target_task = factory.SubFactory(TaskRunFactory)
-    relationship_type = factory.Faker('random_element', elements=[
-        'direct', 'transformation', 'aggregation', 'join'
-    ])
+    relationship_type = factory.LazyFunction(
+        lambda: rng.choice(_LINEAGE_RELATIONSHIPS)
+    )
     
     metadata = factory.LazyFunction(lambda: {
         'columns_mapping': {
@@ -361,7 +429,7 @@ class LongRunningPipelineRunFactory(PipelineRunFactory):
     trigger_type = TriggerType.SCHEDULED
     
     context = factory.LazyFunction(lambda: {
-        'execution_id': fake.uuid4(),
+        'execution_id': str(uuid.uuid4()),
         'environment': 'prod',
         'executor': 'kubernetes',
         'parameters': {
@@ -382,54 +450,68 @@ class LongRunningPipelineRunFactory(PipelineRunFactory):
 class ExecutionHistoryFactory:
     """Factory pour créer un historique d'exécutions"""
     
+    # Scénarios d'exécution (factory, surcharges) tirés avec rng.choices :
+    # 4/6 de succès, 1/6 d'échecs, 1/6 de timeouts
+    _SCENARIOS = (
+        (SuccessfulPipelineRunFactory, {}),
+        (FailedPipelineRunFactory, {}),
+        (PipelineRunFactory, {'status': RunStatus.TIMEOUT}),
+    )
+    _SCENARIO_WEIGHTS = (4, 1, 1)
+    
     @classmethod
-    def create_pipeline_history(cls, pipeline, days=30):
-        """Crée un historique d'exécutions pour un pipeline"""
+    def create_pipeline_history(cls, pipeline, days=30, triggered_by=None,
+                                now=None):
+        """
+        Crée un historique d'exécutions pour un pipeline
+        
+        Les exécutions sont construites en mémoire (build) puis insérées
+        avec un bulk_create par table, dans une seule transaction. ``now``
+        sert de référence à toutes les exécutions du lot (par défaut
+        l'heure courante).
+        """
+        if triggered_by is None:
+            triggered_by = pipeline.created_by
+        
         runs = []
-        current_date = timezone.now()
+        task_runs = []
+        current_date = now if now is not None else timezone.now()
         
-        for day in range(days):
-            run_date = current_date - timedelta(days=day)
-            
-            # Simuler différents scénarios d'exécution
-            scenario = fake.random_element([
-                'success', 'success', 'success', 'success',  # 80% de succès
-                'failed', 'timeout'  # 20% d'échecs
-            ])
+        with transaction.atomic():
+            # Une tâche par étape, partagée par toutes les exécutions
+            steps = list(pipeline.steps.all())
+            tasks = {step.pk: TaskFactory(pipeline_step=step) for step in steps}
             
-            if scenario == 'success':
-                run = SuccessfulPipelineRunFactory(
-                    pipeline=pipeline,
-                    started_at=run_date,
-                    trigger_type=TriggerType.SCHEDULED
-                )
-            elif scenario == 'failed':
-                run = FailedPipelineRunFactory(
-                    pipeline=pipeline,
-                    started_at=run_date,
-                    trigger_type=TriggerType.SCHEDULED
-                )
-            else:  # timeout
-                run = PipelineRunFactory(
+            scenarios = rng.choices(
+                cls._SCENARIOS,
+                weights=cls._SCENARIO_WEIGHTS,
+                k=days
+            )
+            for day, (run_factory, overrides) in enumerate(scenarios):
+                run = run_factory.build(
                     pipeline=pipeline,
-                    started_at=run_date,
-                    status=RunStatus.TIMEOUT,
-                    trigger_type=TriggerType.SCHEDULED
+                    triggered_by=triggered_by,
+                    started_at=current_date - timedelta(days=day),
+                    trigger_type=TriggerType.SCHEDULED,
+                    **overrides
                 )
-            
-            runs.append(run)
-            
-            # Créer des task runs pour chaque pipeline run
-            for step in pipeline.steps.all():
-                task_status = RunStatus.SUCCESS if run.status == RunStatus.SUCCESS else fake.random_element([
-                    RunStatus.SUCCESS, RunStatus.FAILED, RunStatus.SKIPPED
-                ])
+                runs.append(run)
                 
-                TaskRunFactory(
-                    pipeline_run=run,
-                    pipeline_step=step,
-                    status=task_status,
-                    started_at=run.started_at + timedelta(minutes=fake.random_int(0, 10)),
-                )
+                # Task runs pour chaque étape du pipeline
+                for step in steps:
+                    task_status = RunStatus.SUCCESS if run.status == RunStatus.SUCCESS else rng.choice(
+                        _TASK_OUTCOMES_AFTER_FAILURE
+                    )
+                    
+                    task_runs.append(TaskRunFactory.build(
+                        pipeline_run=run,
+                        pipeline_step=step,
+                        task=tasks[step.pk],
+                        status=task_status,
+                        started_at=run.started_at + timedelta(minutes=rng.randint(0, 10)),
+                    ))
+            
+            PipelineRun.objects.bulk_create(runs, batch_size=BULK_BATCH_SIZE)
+            TaskRun.objects.bulk_create(task_runs, batch_size=BULK_BATCH_SIZE)
         
         return runs
@@ -4,19 +4,17 @@ Factories pour les modèles de monitoring
 import factory
 from django.utils import timezone
 from datetime import timedelta
-from faker import Faker
 from apps.monitoring.models import (
     Alert, Metric, HealthCheck, PerformanceReport,
     NotificationChannel, NotificationRule, NotificationLog,
     AlertLevel, AlertType, MetricType
 )
+from ._faker import fake
 from .execution_factories import PipelineRunFactory, TaskRunFactory
 from .pipelines_factories import PipelineFactory
 from .core_factories import OrganizationFactory
 from .authentication_factories import CustomUserFactory
 
-fake = Faker('fr_FR')
-
 
 class AlertFactory(factory.django.DjangoModelFactory):
     """Factory pour Alert"""
@@ -2,17 +2,15 @@
 Factories pour les modèles de pipelines
 """
 import factory
-from faker import Faker
 from apps.pipelines.models import (
     Pipeline, PipelineStep, PipelineSchedule, 
     PipelineTag, PipelineTagAssignment,
     PipelineStatus, StepType
 )
+from ._faker import fake
 from .core_factories import OrganizationFactory
 from .authentication_factories import CustomUserFactory
 
-fake = Faker('fr_FR')
-
 
 class PipelineFactory(factory.django.DjangoModelFactory):
     """Factory pour Pipeline"""
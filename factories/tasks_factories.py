@@ -2,17 +2,15 @@
 Factories pour les modèles de tâches
 """
 import factory
-from faker import Faker
 from apps.tasks.models import (
     TaskTemplate, Task, TaskParameter, TaskDependency,
     TaskType
 )
+from ._faker import fake
 from .core_factories import OrganizationFactory
 from .authentication_factories import CustomUserFactory
 from .pipelines_factories import PipelineStepFactory
 
-fake = Faker('fr_FR')
-
 
 class TaskTemplateFactory(factory.django.DjangoModelFactory):
     """Factory pour TaskTemplate"""